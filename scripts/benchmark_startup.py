@@ -0,0 +1,131 @@
+"""
+Measure how long a fresh worker takes to import the app and to start serving.
+
+Every run uses a new interpreter, so nothing is shared between runs:
+
+* import: time to `import src.main` (module import side effects included)
+* boot: time from launching uvicorn until the app answers HTTP requests
+
+Usage (from the repository root, with the usual environment variables set):
+
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 10 --skip-boot
+    python scripts/benchmark_startup.py --importtime 15
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import src.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def measure_import() -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import src.main failed:\n{result.stderr.strip()}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_boot(timeout: float) -> float:
+    """Launch uvicorn and poll until the app answers (any HTTP status counts)."""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                error = "\n".join(process.stderr.read().strip().splitlines()[-20:])
+                raise RuntimeError(f"uvicorn exited during startup:\n{error}")
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/openapi.json", timeout=1)
+                return time.perf_counter() - started
+            except urllib.error.HTTPError:
+                return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"app did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def slowest_imports(count: int) -> list:
+    """Top modules by cumulative import time, from `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1e6, name.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def report(name: str, samples: list) -> None:
+    print(
+        f"{name:<8} median {statistics.median(samples):.3f}s  "
+        f"min {min(samples):.3f}s  max {max(samples):.3f}s  ({len(samples)} runs)"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--skip-boot", action="store_true", help="Only measure the import")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for the app to answer")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="Also list the N slowest imports")
+    args = parser.parse_args()
+
+    try:
+        report("import", [measure_import() for _ in range(args.runs)])
+        if not args.skip_boot:
+            report("boot", [measure_boot(args.timeout) for _ in range(args.runs)])
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if args.importtime:
+        print("\nslowest imports (cumulative):")
+        for seconds, name in slowest_imports(args.importtime):
+            print(f"  {seconds:.3f}s  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Request
 from src.commonLib.utils.logger_config import logger
 from datetime import datetime
-from src.models.visits_model import visits_collection
+from src.models.visits_model import get_visits_collection
 
 router = APIRouter()
 
@@ -22,7 +22,7 @@ async def track_visit(request: Request):
 
     # Store visit in MongoDB
     try:
-        visits_collection.insert_one(visit_data)
+        get_visits_collection().insert_one(visit_data)
         logger.info(f" Visitor logged: {visit_data}")
         return {"message": "Visit tracked successfully"}
     except Exception as e:
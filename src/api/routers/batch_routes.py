@@ -0,0 +1,86 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from src.api.routers import instagram_routes, youtube_routes
+from src.commonLib.utils.logger_config import logger
+from src.core.settings.configurations.config import settings
+from src.schemas.batch_schema import BatchItemError, BatchMetadataItem, BatchMetadataRequest
+
+router = APIRouter()
+
+# Per-platform caps shared by every batch request in this worker.
+platform_slots: Dict[str, asyncio.Semaphore] = {
+    "youtube": asyncio.Semaphore(settings.BATCH_YOUTUBE_CONCURRENCY),
+    "instagram": asyncio.Semaphore(settings.BATCH_INSTAGRAM_CONCURRENCY),
+}
+
+
+def detect_platform(url: str) -> Optional[str]:
+    if "youtube.com" in url or "youtu.be" in url:
+        return "youtube"
+    if "instagram.com" in url:
+        return "instagram"
+    return None
+
+
+async def resolve_youtube(url: str):
+    raw_info = await youtube_routes.get_video_info(url)
+    return await run_in_threadpool(youtube_routes.format_video_metadata, raw_info)
+
+
+async def resolve_instagram(url: str):
+    return await instagram_routes.get_instagram_metadata(url)
+
+
+resolvers: Dict[str, Callable[[str], Awaitable]] = {
+    "youtube": resolve_youtube,
+    "instagram": resolve_instagram,
+}
+
+
+async def resolve_item(index: int, url: str) -> BatchMetadataItem:
+    """Resolve one URL, turning any failure into a per-item error."""
+    platform = detect_platform(url)
+    item = BatchMetadataItem(index=index, url=url, platform=platform)
+    if not platform:
+        item.error = BatchItemError(status_code=400, detail="Unsupported URL")
+        return item
+    try:
+        async with platform_slots[platform]:
+            item.data = jsonable_encoder(await resolvers[platform](url))
+    except HTTPException as e:
+        item.error = BatchItemError(status_code=e.status_code, detail=str(e.detail))
+    except Exception as e:
+        logger.error(f"Batch metadata failed for {url}: {e}")
+        item.error = BatchItemError(status_code=500, detail="Failed to fetch metadata")
+    return item
+
+
+@router.post("/metadata")
+async def batch_metadata(request: BatchMetadataRequest) -> StreamingResponse:
+    """
+    Resolve metadata for YouTube and Instagram URLs concurrently.
+
+    Results are streamed as NDJSON, one line per URL in completion order, so a
+    slow item never holds back the fast ones. Each line carries the URL's
+    request index and either `data` or an `error`.
+    """
+    async def stream() -> AsyncIterator[str]:
+        # Created here so that a client gone before streaming starts leaves no tasks behind.
+        tasks = [
+            asyncio.create_task(resolve_item(index, url))
+            for index, url in enumerate(request.urls)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                yield item.model_dump_json() + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,59 +1,75 @@
+from __future__ import annotations
+
+import base64
 import json
-from fastapi import FastAPI, APIRouter, HTTPException, Query
-from fastapi.responses import RedirectResponse, StreamingResponse
-import requests
+import re
+import time
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from src.commonLib.utils.logger_config import logger
-import yt_dlp
-import instaloader
 from datetime import datetime
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
 from pydantic import HttpUrl
-from src.schemas.instagram_schema import InstagramPostResponse
+from src.commonLib.utils.utils import utils
+from src.core.services.cache import TieredCache
+from src.core.services.instagram_resolver import ResolveError, instagram_resolver
+from src.core.services.instaloader_pool import instaloader_pool, is_throttled
+from src.core.services.media_proxy import media_proxy
+from src.core.services.segmented_fetch import segmented_fetcher
+from src.core.services.zip_stream import stream_zip
+from src.core.settings.configurations.config import settings
+from src.schemas.instagram_schema import (
+    InstagramPostResponse,
+    InstagramProfileInfo,
+    InstagramProfilePageEnd,
+    InstagramProfilePost,
+)
 
 # Initialize FastAPI app and router
 app = FastAPI()
 router = APIRouter()
 
-import instaloader
 import os
 from typing import Optional
 import logging
 
+if TYPE_CHECKING:
+    # instaloader is imported where it is used, so importing the router stays cheap.
+    import instaloader
+
 logger = logging.getLogger(__name__)
 
-# Path to the session file
-SESSION_FILE = "instagram_session"
+# Conditional/range request headers forwarded to the CDN, and the response headers relayed back.
+FORWARDED_REQUEST_HEADERS = ("Range", "If-Range")
+RELAYED_RESPONSE_HEADERS = ("Content-Length", "Content-Range", "Accept-Ranges", "ETag", "Last-Modified")
 
-# Set up proxy (change this to your proxy details)
-PROXY = "http://your-proxy-ip:port"
+# Signed Instagram CDN URLs carry their expiry as a hex unix timestamp in `oe`.
+CDN_EXPIRY_PATTERN = re.compile(r"[?&]oe=([0-9A-Fa-f]+)")
+# Stop serving a cached post this long before its CDN URLs expire.
+CDN_EXPIRY_MARGIN_SECONDS = 300
 
-def login_instaloader() -> instaloader.Instaloader:
-    """Initialize Instaloader with session cookies and proxy."""
-    L = instaloader.Instaloader()
+USERNAME_PATTERN = re.compile(r"^[A-Za-z0-9._]{1,30}$")
 
-    # Set proxy if available
-    if PROXY:
-        L.context.proxy = PROXY
-
-    # Load saved session if available
-    if os.path.exists(SESSION_FILE):
-        try:
-            L.load_session_from_file("your_instagram_username", SESSION_FILE)
-            logger.info("Loaded Instagram session successfully.")
-        except Exception as e:
-            logger.error(f"Error loading session: {e}")
-            raise
-    else:
-        logger.error("No saved session found. Please log in first.")
-        raise FileNotFoundError("Instagram session not found. Run login first.")
-
-    return L
+post_cache = TieredCache(
+    "instagram-posts",
+    directory=os.path.join(settings.CACHE_DIR, "instagram-posts"),
+    max_entries=settings.METADATA_CACHE_SIZE,
+    default_ttl=settings.INSTAGRAM_POST_CACHE_TTL_SECONDS,
+)
 
 
 def get_owner_details(post: instaloader.Post) -> dict:
     """Extract owner details from the post's node."""
     try:
-        owner_data = post._node["owner"]
+        owner_data = post._node.get("owner")
+        if owner_data is None and post._owner_profile is not None:
+            # Posts from a logged-in profile feed carry their owner as a Profile.
+            profile_node = post._owner_profile._node
+            owner_data = {**profile_node, "profile_pic_url": profile_node.get("profile_pic_url_hd")}
+        if owner_data is None:
+            raise KeyError("owner")
         return {
             "id": owner_data.get("id"),
             "username": owner_data.get("username"),
@@ -74,7 +90,7 @@ def get_owner_details(post: instaloader.Post) -> dict:
 
 def extract_shortcode(url: str) -> str:
     """Extract shortcode from Instagram URL"""
-    url = url.strip("/")
+    url = url.split("?")[0].strip("/")
     for pattern in ["/reel/", "/p/", "/tv/"]:
         if pattern in url:
             return url.split(pattern)[-1].split("/")[0]
@@ -82,13 +98,26 @@ def extract_shortcode(url: str) -> str:
 
 
 def get_instagram_post(url: str) -> Optional[instaloader.Post]:
-    """Fetch Instagram post using instaloader"""
+    """Fetch Instagram post using a pooled, long-lived instaloader context
+
+    Returns None when the post does not exist or is private; any other failure raises.
+    """
+    import instaloader
+    from instaloader.exceptions import (
+        BadResponseException,
+        LoginRequiredException,
+        QueryReturnedNotFoundException,
+    )
+
+    shortcode = extract_shortcode(url)
     try:
-        L = instaloader.Instaloader()
-        shortcode = extract_shortcode(url)
-        return instaloader.Post.from_shortcode(L.context, shortcode)
-    except Exception as e:
-        logger.error(f"Error fetching Instagram post: {e}")
+        return instaloader_pool.run(
+            lambda loader: instaloader.Post.from_shortcode(loader.context, shortcode)
+        )
+    except HTTPException:
+        raise
+    except (BadResponseException, LoginRequiredException, QueryReturnedNotFoundException) as e:
+        logger.info(f"Instagram post {shortcode} is missing or private: {e}")
         return None
 
 
@@ -102,13 +131,25 @@ def classify_post(post: instaloader.Post) -> str:
 
 def process_media(post: instaloader.Post) -> List[dict]:
     """Process media for all post types (single post, video, carousel)."""
+    media = media_from_node(post._node)
+    logger.info(f"Processed media: {json.dumps(media, indent=2)}")  # Log output for debugging
+    return media
+
+
+def media_from_node(post_node: dict) -> List[dict]:
+    """Media items of a post from its GraphQL-style node; shared by instaloader posts and the lean resolver."""
     media = []
-    
-    if post._node.get("edge_sidecar_to_children"):  # Carousel posts
-        for index, child in enumerate(post._node.get("edge_sidecar_to_children").get("edges", [])):
+
+    if post_node.get("edge_sidecar_to_children"):  # Carousel posts
+        for index, child in enumerate(post_node.get("edge_sidecar_to_children").get("edges", [])):
             node = child.get("node", {})
             media_type = "video" if node.get("is_video") else "image"
-            media_url = node.get("video_url") if node.get("is_video") else node.get("display_resources")[-1].get("src")
+            if node.get("is_video"):
+                media_url = node.get("video_url")
+            elif node.get("display_resources"):
+                media_url = node["display_resources"][-1].get("src")
+            else:
+                media_url = node.get("display_url")
             
             if not media_url:
                 logger.error(f"Missing media URL for index {index}")
@@ -121,8 +162,8 @@ def process_media(post: instaloader.Post) -> List[dict]:
             })
 
     else:  # Single image or video post
-        media_type = "video" if post._node.get("is_video") else "image"
-        media_url = post._node.get("video_url") if post._node.get("is_video") else post._node.get("display_url")
+        media_type = "video" if post_node.get("is_video") else "image"
+        media_url = post_node.get("video_url") if post_node.get("is_video") else post_node.get("display_url")
 
         if not media_url:
             logger.error("Missing media URL for single post")
@@ -134,7 +175,6 @@ def process_media(post: instaloader.Post) -> List[dict]:
             "type": media_type  # Ensure "type" key is included
         })
 
-    logger.info(f"Processed media: {json.dumps(media, indent=2)}")  # Log output for debugging
     return media
 
 
@@ -150,53 +190,338 @@ def get_music_info(post: instaloader.Post) -> Optional[str]:
     return None
 
 
-@router.get("/metadata")
-async def instagram_metadata(url: str):
-    """Fetch Instagram post metadata"""
+def get_caption(post: instaloader.Post) -> Optional[str]:
+    if "caption" in post._node:  # Posts from a logged-in profile feed
+        return post._node["caption"]
+    return (
+        post._node.get("edge_media_to_caption", {})
+        .get("edges", [{}])[0]
+        .get("node", {})
+        .get("text")
+    )
+
+
+# How each metadata field is built from a post.
+INSTAGRAM_FIELD_BUILDERS: Dict[str, Callable[[instaloader.Post], Any]] = {
+    "id": lambda post: post._node["id"],
+    "shortcode": lambda post: post._node["shortcode"],
+    "type": classify_post,
+    "caption": get_caption,
+    "timestamp": lambda post: datetime.fromtimestamp(post._node.get("taken_at_timestamp") or post._node["date"]),
+    "like_count": lambda post: post._node.get("edge_media_preview_like", {}).get("count"),
+    "view_count": lambda post: post._node.get("video_view_count") if post._node.get("is_video") else None,
+    "media": process_media,
+    "username": lambda post: get_owner_details(post)["username"],
+    "user_avatar": lambda post: get_owner_details(post)["profile_pic_url"],
+    "music": get_music_info,
+    "is_sponsored": lambda post: post._node.get("is_ad", False),
+}
+
+
+def post_entry(post: instaloader.Post) -> dict:
+    """Build the cache entry of an already fetched post."""
     try:
-        if "instagram.com" not in url:
-            raise HTTPException(status_code=400, detail="Invalid Instagram URL")
+        metadata = {name: build(post) for name, build in INSTAGRAM_FIELD_BUILDERS.items()}
+    except HTTPException as he:
+        return {"error": {"status_code": he.status_code, "detail": he.detail}}
+    except Exception as e:
+        logger.error(f"Error fetching Instagram metadata: {e}")
+        return {"error": {"status_code": 500, "detail": "Failed to process Instagram post"}}
+    return {"metadata": jsonable_encoder(metadata)}
 
-        # Fetch post data
-        post = get_instagram_post(url)
 
-        if not post:
-            raise HTTPException(status_code=404, detail="Post not found or private")
-
-        # Extract owner details
-        owner_details = get_owner_details(post)
-
-        # Prepare response data
-        response_data = {
-            "id": post._node["id"],
-            "shortcode": post._node["shortcode"],
-            "type": classify_post(post),
-            "caption": post._node.get("edge_media_to_caption", {})
-            .get("edges", [{}])[0]
-            .get("node", {})
-            .get("text"),
-            "timestamp": datetime.fromtimestamp(post._node["taken_at_timestamp"]),
-            "like_count": post._node.get("edge_media_preview_like", {}).get("count"),
-            "view_count": (
-                post._node.get("video_view_count")
-                if post._node.get("is_video")
-                else None
-            ),
-            "media": process_media(post),
-            "username": owner_details["username"],
-            "user_avatar": owner_details["profile_pic_url"],
-            "music": get_music_info(post),
-            "is_sponsored": post._node.get("is_ad", False),
-        }
+def build_post_entry(url: str) -> dict:
+    """Fetch an Instagram post and build its cache entry (blocking).
 
-        return response_data
+    Every metadata field is built once, so later requests for any subset of
+    fields or any media item are served from the entry. Missing, private and
+    failing posts produce a negative entry carrying the error instead, so
+    retries don't reach Instagram until it expires. Pool errors (busy or
+    throttled sessions) are not about the post and are raised as-is.
+    """
+    try:
+        post = get_instagram_post(url)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching Instagram post: {e}")
+        return {"error": {"status_code": 502, "detail": "Failed to fetch post from Instagram"}}
+    if not post:
+        return {"error": {"status_code": 404, "detail": "Post not found or private"}}
+    return post_entry(post)
+
+
+def post_entry_ttl(entry: dict) -> float:
+    """Keep negative entries briefly, and posts no longer than their CDN URLs stay valid."""
+    if "error" in entry:
+        if entry["error"]["status_code"] == 404:
+            return settings.INSTAGRAM_NEGATIVE_CACHE_TTL_SECONDS
+        return settings.INSTAGRAM_FAILURE_CACHE_TTL_SECONDS
+    ttl = settings.INSTAGRAM_POST_CACHE_TTL_SECONDS
+    now = time.time()
+    for match in CDN_EXPIRY_PATTERN.finditer(json.dumps(entry)):
+        ttl = min(ttl, int(match.group(1), 16) - now - CDN_EXPIRY_MARGIN_SECONDS)
+    return ttl
+
+
+async def get_post_metadata(url: str) -> dict:
+    """
+    Return every metadata field of a post, served from the post cache when possible.
+
+    The cache is keyed by shortcode, so /metadata, the batch resolver and
+    downloads that fall back to Instaloader share one Instagram fetch. The
+    returned dict is shared with other requests and must not be mutated.
+    """
+    if "instagram.com" not in url:
+        raise HTTPException(status_code=400, detail="Invalid Instagram URL")
+    entry = await post_cache.get_or_load(
+        f"post:{extract_shortcode(url)}",
+        lambda: instaloader_pool.call(build_post_entry, url),
+        ttl=post_entry_ttl,
+    )
+    if "error" in entry:
+        raise HTTPException(**entry["error"])
+    return entry["metadata"]
+
+
+async def get_post_media(url: str) -> List[dict]:
+    """
+    Return the media items of a post, as needed for downloads.
+
+    A cached post is used when there is one. Otherwise the lean resolver
+    fetches just the media with one request, and Instaloader (through the post
+    cache) is only used when that fails, e.g. for private posts. Resolved media
+    is cached under its own key until its CDN URLs expire.
+    """
+    if "instagram.com" not in url:
+        raise HTTPException(status_code=400, detail="Invalid Instagram URL")
+    shortcode = extract_shortcode(url)
+    entry = await run_in_threadpool(post_cache.get, f"post:{shortcode}")
+    if entry is not None:
+        if "error" in entry:
+            raise HTTPException(**entry["error"])
+        return entry["metadata"]["media"]
+
+    async def load() -> dict:
+        if settings.INSTAGRAM_LEAN_RESOLVER:
+            try:
+                return {"media": media_from_node(await instagram_resolver.fetch_node(shortcode))}
+            except (ResolveError, HTTPException) as e:
+                logger.info(f"Lean resolve of {shortcode} failed ({e}), falling back to Instaloader")
+        return {"media": (await get_post_metadata(url))["media"]}
+
+    entry = await post_cache.get_or_load(f"media:{shortcode}", load, ttl=post_entry_ttl)
+    return entry["media"]
+
+
+async def get_instagram_metadata(url: str, fields: Optional[List[str]] = None) -> dict:
+    """Post metadata limited to `fields` (all fields when None)."""
+    metadata = await get_post_metadata(url)
+    return {name: metadata[name] for name in (fields or INSTAGRAM_FIELD_BUILDERS)}
+
+
+def encode_profile_cursor(after: Optional[str], skip: int, index: int) -> str:
+    payload = {"after": after, "skip": skip, "index": index}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_profile_cursor(cursor: Optional[str]) -> Tuple[Optional[str], int, int]:
+    """
+    Return (page cursor, posts to skip on that page, feed index) for a profile cursor.
+
+    The page cursor is Instagram's `end_cursor` of the page before the one to
+    resume on (None for the first page).
+    """
+    if not cursor:
+        return None, 0, 0
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        after, skip, index = payload["after"], int(payload["skip"]), int(payload["index"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if (after is not None and not isinstance(after, str)) or skip < 0 or index < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return after, skip, index
+
+
+def feed_end_cursor(posts: instaloader.NodeIterator) -> Optional[str]:
+    """Instagram's `end_cursor` for the page `posts` is reading, from its frozen state."""
+    page = posts.freeze().remaining_data or {}
+    return (page.get("page_info") or {}).get("end_cursor")
+
+
+def iter_profile_posts(
+    loader: instaloader.Instaloader, username: str, after: Optional[str], skip: int, index: int, limit: int
+) -> Iterator[Union[InstagramProfileInfo, InstagramProfilePost, InstagramProfilePageEnd, None]]:
+    """
+    Blocking generator over one page of a profile's posts, newest first.
+
+    Yields the profile, then up to `limit` posts, then the page end. Posts come
+    from `Profile.get_posts()`, which fetches 12 posts per upstream request and
+    already includes what the metadata fields need, so each post is built and
+    stored in the post cache without further requests. Yields None right after
+    each upstream request for more posts, where the caller may release the
+    context until it reads on. To resume, the iterator is thawed at an empty
+    page whose next page is the cursor's, and the posts of that page already
+    returned are skipped.
+    """
+    import instaloader
 
-        # return InstagramPostResponse(**response_data)
-    except HTTPException as he:
-        raise he
+    try:
+        profile = instaloader.Profile.from_username(loader.context, username)
+    except instaloader.exceptions.ProfileNotExistsException:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if profile.is_private and not profile.followed_by_viewer:
+        raise HTTPException(status_code=403, detail="Profile is private")
+    yield InstagramProfileInfo(
+        id=str(profile.userid),
+        username=profile.username,
+        full_name=profile.full_name,
+        profile_pic_url=profile.profile_pic_url,
+        post_count=profile.mediacount,
+        is_private=profile.is_private,
+    )
+
+    posts = profile.get_posts()
+    if after is not None:
+        fresh = posts.freeze()
+        posts.thaw(instaloader.FrozenNodeIterator(
+            query_hash=fresh.query_hash,
+            query_variables=fresh.query_variables,
+            query_referer=fresh.query_referer,
+            context_username=fresh.context_username,
+            total_index=0,
+            best_before=fresh.best_before,
+            remaining_data={"edges": [], "page_info": {"has_next_page": True, "end_cursor": after}},
+            first_node=None,
+            doc_id=fresh.doc_id,
+        ))
+
+    # `page_after` fetches the page being read, `on_page` of its posts are read.
+    page_after, page_end, on_page = after, feed_end_cursor(posts), 0
+    returned = 0
+    while True:
+        post = next(posts, None)
+        if post is not None and feed_end_cursor(posts) != page_end:
+            page_after, page_end, on_page = page_end, feed_end_cursor(posts), 0
+            yield None
+        if post is None:
+            yield InstagramProfilePageEnd(count=returned)
+            return
+        on_page += 1
+        if skip:
+            skip -= 1
+            continue
+        if returned == limit:
+            # This post starts the next page of results.
+            next_cursor = encode_profile_cursor(page_after, on_page - 1, index)
+            yield InstagramProfilePageEnd(count=returned, next_cursor=next_cursor)
+            return
+        entry = post_entry(post)
+        if "metadata" in entry:
+            post_cache.set(f"post:{post.shortcode}", entry, ttl=post_entry_ttl(entry))
+        returned += 1
+        yield InstagramProfilePost(
+            index=index,
+            shortcode=post.shortcode,
+            metadata=entry.get("metadata"),
+            error=entry.get("error", {}).get("detail"),
+            resume_cursor=encode_profile_cursor(page_after, on_page, index + 1),
+        )
+        index += 1
+
+
+def read_profile_page(
+    feed: Iterator[Union[InstagramProfileInfo, InstagramProfilePost, InstagramProfilePageEnd, None]],
+) -> Tuple[List[Union[InstagramProfileInfo, InstagramProfilePost, InstagramProfilePageEnd]], Optional[Iterator]]:
+    """Read `iter_profile_posts` up to its next upstream request; returns the items and the feed to continue with."""
+    items = []
+    for item in feed:
+        if item is None:
+            return items, feed
+        items.append(item)
+    return items, None
+
+
+@router.get("/profile")
+async def instagram_profile(
+    username: str = Query(..., description="Instagram username"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    limit: int = Query(settings.INSTAGRAM_PROFILE_PAGE_SIZE, ge=1, le=200),
+) -> StreamingResponse:
+    """
+    Stream a profile's posts as NDJSON, newest first.
+
+    The first line describes the profile, then one line per post with the same
+    fields as /metadata as soon as it is read, and a final line with
+    `next_cursor` for the next page. Every post is also stored in the post
+    cache, so downloading it afterwards needs no further Instagram lookups.
+    """
+    username = username.strip().lstrip("@")
+    if not USERNAME_PATTERN.match(username):
+        raise HTTPException(status_code=400, detail="Invalid Instagram username")
+    after, skip, index = decode_profile_cursor(cursor)
+    # The context is leased once per upstream page, not for the whole response.
+    items = instaloader_pool.paginate(
+        lambda loader, feed: read_profile_page(
+            feed or iter_profile_posts(loader, username, after, skip, index, limit)
+        )
+    )
+    try:
+        # Read the profile itself before responding so lookup errors keep their status code.
+        profile = await items.__anext__()
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching Instagram metadata: {e}")
-        raise HTTPException(status_code=500, detail="Failed to process Instagram post")
+        logger.error(f"Failed to fetch Instagram profile {username}: {e}")
+        if is_throttled(e):
+            raise HTTPException(status_code=503, detail="Instagram is rate limiting us, please retry later.")
+        raise HTTPException(status_code=500, detail="Failed to fetch profile.")
+
+    async def stream() -> AsyncIterator[str]:
+        returned = 0
+        resume_cursor = cursor
+        try:
+            yield profile.model_dump_json() + "\n"
+            try:
+                async for item in items:
+                    if isinstance(item, InstagramProfilePost):
+                        returned += 1
+                        resume_cursor = item.resume_cursor
+                    yield item.model_dump_json() + "\n"
+            except Exception as e:
+                # End the page early; the cursor resumes after the last post sent.
+                logger.error(f"Profile feed of {username} stopped early: {e}")
+                yield InstagramProfilePageEnd(count=returned, next_cursor=resume_cursor).model_dump_json() + "\n"
+        finally:
+            await items.aclose()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.get("/cache/stats")
+async def instagram_cache_stats() -> dict:
+    """Return hit, miss and coalesce counters for the post cache."""
+    return post_cache.stats()
+
+
+@router.get("/sessions/stats")
+async def instagram_session_stats() -> dict:
+    """Return queue-time counters of the Instaloader threads and each context's lease counters."""
+    return instaloader_pool.stats()
+
+
+@router.get("/metadata")
+async def instagram_metadata(
+    url: str,
+    fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. 'caption,username'"),
+):
+    """Fetch Instagram post metadata"""
+    try:
+        requested = utils.parse_fields(fields, INSTAGRAM_FIELD_BUILDERS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await get_instagram_metadata(url, requested)
 
 
 
@@ -204,16 +529,19 @@ async def instagram_metadata(url: str):
 
 @router.get("/download")
 async def download_instagram_media(
+    request: Request,
     url: str = Query(..., description="Instagram post URL"),
     media_index: int = Query(0, description="Index of media in carousel"),
 ):
-    """Download Instagram media with correct file extension."""
-    try:
-        post = get_instagram_post(url)
-        if not post:
-            raise HTTPException(status_code=404, detail="Post not found")
+    """
+    Download Instagram media with correct file extension.
 
-        media = process_media(post)
+    The client's Range header is passed to the CDN and the partial response is
+    relayed as-is, so interrupted downloads can resume and players can seek.
+    Full downloads of large media are fetched as parallel byte ranges.
+    """
+    try:
+        media = await get_post_media(url)
 
         if media_index >= len(media):
             raise HTTPException(
@@ -229,19 +557,105 @@ async def download_instagram_media(
         # Get file extension based on media type
         file_extension = "mp4" if media_type == "video" else "jpg"
 
+        filename = f"instagram_media_{media_index}.{file_extension}"
+
         # Fetch the media
-        response = requests.get(media_url, stream=True)
+        upstream_headers = {
+            name: request.headers[name] for name in FORWARDED_REQUEST_HEADERS if name in request.headers
+        }
+        response = await media_proxy.open(media_url, upstream_headers)
+        if response.status_code == 416:
+            await response.aclose()
+            return Response(
+                status_code=416,
+                headers={"Content-Range": response.headers.get("Content-Range", "bytes */*")},
+            )
+        if response.status_code not in (200, 206):
+            await response.aclose()
+            logger.error(f"Instagram CDN returned {response.status_code} for media {media_index}")
+            raise HTTPException(status_code=502, detail="Failed to fetch media from Instagram")
+
         content_type = response.headers.get("Content-Type", "application/octet-stream")
+        headers = {
+            name: response.headers[name] for name in RELAYED_RESPONSE_HEADERS if name in response.headers
+        }
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+        # Full downloads of large videos are fetched over several connections. The
+        # size comes from the response already open, so no separate probe is sent.
+        size = int(response.headers.get("Content-Length") or 0)
+        if (
+            media_type != "image"
+            and response.status_code == 200
+            and response.headers.get("Accept-Ranges") == "bytes"
+            and size >= settings.SEGMENTED_FETCH_MIN_BYTES
+        ):
+            await response.aclose()
+            return StreamingResponse(
+                segmented_fetcher.stream(media_url, size),
+                media_type=content_type,
+                headers={
+                    "Content-Length": str(size),
+                    "Accept-Ranges": "bytes",
+                    "Content-Disposition": f'attachment; filename="{filename}"',
+                },
+            )
 
         return StreamingResponse(
-            response.iter_content(chunk_size=1024 * 1024),
+            media_proxy.stream(response),
+            status_code=response.status_code,
             media_type=content_type,
-            headers={
-                "Content-Disposition": f'attachment; filename="instagram_media_{media_index}.{file_extension}"'
-            },
+            headers=headers,
         )
 
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logger.error(f"Error processing Instagram download: {e}")
         raise HTTPException(status_code=500, detail="Failed to process download")
 
+
+@router.get("/download/zip")
+async def download_instagram_zip(url: str = Query(..., description="Instagram post URL")):
+    """
+    Download every item of a post as one ZIP archive.
+
+    The archive is streamed as it is built, with items stored uncompressed in
+    carousel order. Upcoming items are fetched ahead of the one being written,
+    so the whole carousel downloads in one request.
+    """
+    media = await get_post_media(url)
+    if not media or not all(item["url"] for item in media):
+        raise HTTPException(status_code=500, detail="Failed to retrieve media URL")
+    shortcode = extract_shortcode(url)
+    names = [
+        f"instagram_{shortcode}_{index}.{'mp4' if item['type'] == 'video' else 'jpg'}"
+        for index, item in enumerate(media)
+    ]
+
+    async def entries():
+        bodies = media_proxy.fetch_in_order(
+            [item["url"] for item in media],
+            prefetch=settings.INSTAGRAM_ZIP_PREFETCH_ITEMS,
+            buffer_bytes=settings.INSTAGRAM_ZIP_ITEM_BUFFER_BYTES,
+        )
+        index = 0
+        async for size, chunks in bodies:
+            yield names[index], size, chunks
+            index += 1
+
+    async def archive():
+        try:
+            async for data in stream_zip(entries()):
+                yield data
+        except Exception as e:
+            # The response has started; dropping the connection leaves the client
+            # with an incomplete download rather than a truncated archive.
+            logger.error(f"Error streaming Instagram ZIP for {shortcode}: {e}")
+            raise
+
+    return StreamingResponse(
+        archive(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="instagram_{shortcode}.zip"'},
+    )
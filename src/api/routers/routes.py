@@ -4,10 +4,12 @@ from src.commonLib.utils.logger_config import logger
 from src.api.routers import (
     analytics_routes,
     authentication_routes,
+    batch_routes,
     facebook_routes,
     youtube_routes,
     user_routes,
     instagram_routes,
+    thumbnail_routes,
 )
 from src.limiter import limiter 
 
@@ -20,7 +22,9 @@ api_routes = [
     {"router": instagram_routes.router, "prefix": "/instagram", "tag": "Instagram"},
     {"router": user_routes.user_router, "prefix": "/users", "tag": "Users"},
     {"router": facebook_routes.router, "prefix": "/facebook", "tag": "Facebook"},
-        {"router": analytics_routes.router, "prefix": "/analytics", "tag": "Analytics"}
+        {"router": analytics_routes.router, "prefix": "/analytics", "tag": "Analytics"},
+    {"router": batch_routes.router, "prefix": "/batch", "tag": "Batch"},
+    {"router": thumbnail_routes.router, "prefix": "/thumbnails", "tag": "Thumbnails"},
 ]
 
 
@@ -0,0 +1,52 @@
+from typing import Literal, Optional, Union
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import FileResponse
+from src.core.services.download_store import StoredFileResponse
+from src.core.services.thumbnails import avif_supported, thumbnail_service
+from src.core.settings.configurations.config import settings
+
+router = APIRouter()
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """Pick the most compact format the client accepts; JPEG is understood by everyone."""
+    accept = accept or ""
+    if avif_supported() and "image/avif" in accept:
+        return "avif"
+    if "image/webp" in accept:
+        return "webp"
+    return "jpeg"
+
+
+@router.get("", response_model=None)
+async def get_thumbnail(
+    url: str = Query(..., description="Upstream image URL, e.g. a YouTube thumbnail or Instagram display_url"),
+    width: int = Query(320, ge=1, le=4096, description="Rounded up to the nearest configured width"),
+    image_format: Literal["auto", "avif", "webp", "jpeg"] = Query("auto", alias="format"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+) -> Union[FileResponse, Response]:
+    """
+    Serve a resized, re-encoded copy of an upstream image.
+
+    With `format=auto` the format is negotiated from the Accept header (AVIF,
+    then WebP, then JPEG). Thumbnails never change for a given source URL, so
+    they are sent with a long immutable Cache-Control and a strong ETag.
+    """
+    if image_format == "avif" and not avif_supported():
+        raise HTTPException(status_code=400, detail="AVIF is not supported by this server.")
+    chosen = negotiate_format(accept) if image_format == "auto" else image_format
+    stored = await thumbnail_service.acquire(url, thumbnail_service.snap_width(width), chosen)
+
+    etag = f'"{stored.report["etag"]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.THUMBNAIL_MAX_AGE_SECONDS}, immutable",
+    }
+    if image_format == "auto":
+        headers["Vary"] = "Accept"
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        thumbnail_service.release(stored.key)
+        return Response(status_code=304, headers=headers)
+    return StoredFileResponse(stored, thumbnail_service.release, headers=headers)
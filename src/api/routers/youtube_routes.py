@@ -235,60 +235,151 @@ def cleanup_downloaded_file(file_path: str):
 
 
 
-from fastapi import APIRouter, HTTPException, Query, Request
-from fastapi.responses import FileResponse
-import yt_dlp
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, StreamingResponse
+import asyncio
+import base64
+import copy
+import itertools
+import json
+import math
+import requests
 import os
-import subprocess
+import re
+import shutil
+import time
+from collections import deque
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Literal, Optional, List, Tuple, Union
 from loguru import logger
-from src.schemas.youtube_schema import YoutubeVideoMetadata, VideoThumbnail, VideoFormat
+from src.commonLib.utils.async_utils import iterate_in_thread
+from src.commonLib.utils.utils import utils
+from src.core.services.cache import TieredCache
+from src.core.services.download_jobs import download_job_manager
+from src.core.services.download_store import StoredFile, StoredFileResponse, download_store
+from src.core.services.ffmpeg_stream import FRAGMENTED_MP4_ARGS, ffmpeg_streamer
+from src.core.services.transcoder import transcoder
+from src.core.services.youtube_formats import (
+    AUDIO_OUTPUTS,
+    audio_codec_args,
+    codec_family,
+    has_audio,
+    has_video,
+    is_mp4_compatible,
+    parse_height,
+    segment_formats,
+    select_audio_format,
+    select_stream_formats,
+)
+from src.core.services.ytdlp_pool import YTDL_PROFILES, ytdlp_pool
+from src.core.settings.configurations.config import settings
+from src.schemas.youtube_schema import (
+    DirectLink,
+    DownloadJob,
+    PlaylistEntry,
+    PlaylistInfo,
+    PlaylistPageEnd,
+    ProcessingReport,
+    YoutubeVideoMetadata,
+    VideoThumbnail,
+    VideoFormat,
+)
 
 router = APIRouter()
 
-DOWNLOADS_FOLDER = "./downloads"
-os.makedirs(DOWNLOADS_FOLDER, exist_ok=True)
-
-ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-COOKIES_PATH = os.path.join(ROOT_DIR, "youtube.com_.txt")
-
-
+VIDEO_ID_PATTERN = re.compile(r"(?:[?&]v=|/shorts/|/embed/|/live/|/v/|youtu\.be/)([A-Za-z0-9_-]{11})")
+SIGNED_URL_EXPIRE_PATTERN = re.compile(r"[?&/]expire[=/](\d+)")
+# Stop serving cached metadata this long before its signed format URLs expire.
+SIGNED_URL_EXPIRY_MARGIN_SECONDS = 300
+YOUTUBE_OEMBED_URL = "https://www.youtube.com/oembed"
+# Every video has this image, and it is the one oEmbed returns.
+YOUTUBE_THUMBNAIL_URL = "https://i.ytimg.com/vi/{}/hqdefault.jpg"
+# Channel and watch?list= URLs resolve to the actual playlist through at most this many hops.
+MAX_PLAYLIST_REDIRECTS = 3
+# Comment sent on idle progress streams so proxies don't close them.
+SSE_HEARTBEAT_SECONDS = 15
+
+metadata_cache = TieredCache(
+    "youtube-metadata",
+    directory=os.path.join(settings.CACHE_DIR, "youtube-metadata"),
+    max_entries=settings.METADATA_CACHE_SIZE,
+    default_ttl=settings.METADATA_CACHE_TTL_SECONDS,
+)
+
+# Shared cap on full-metadata extractions started by playlist listings.
+playlist_metadata_slots = asyncio.Semaphore(settings.PLAYLIST_FULL_METADATA_CONCURRENCY)
 
 
 def check_ffmpeg():
-    """Check if FFmpeg is installed and accessible."""
-    try:
-        result = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True)
-        logger.info(f"FFmpeg Version: {result.stdout.splitlines()[0]}")
-        return True
-    except Exception as e:
+    """Check if FFmpeg is installed and accessible. Called once at application startup."""
+    path = shutil.which("ffmpeg")
+    if not path:
         logger.error("FFmpeg is not installed. Install FFmpeg to process videos.")
         return False
-
-if not check_ffmpeg():
-    raise RuntimeError("FFmpeg is required but not found. Please install it.")
-
-def get_video_info(url: str) -> dict:
-    """Fetch YouTube video metadata using yt-dlp."""
+    logger.info(f"FFmpeg found at {path}")
+    return True
+
+def extract_video_id(url: str) -> Optional[str]:
+    """Extract the 11 character video id from any common YouTube URL form."""
+    match = VIDEO_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+def metadata_ttl(info: dict) -> float:
+    """Cache metadata no longer than the signed format URLs inside it stay valid."""
+    ttl = settings.METADATA_CACHE_TTL_SECONDS
+    now = time.time()
+    for fmt in info.get("formats") or []:
+        match = SIGNED_URL_EXPIRE_PATTERN.search(fmt.get("url") or "")
+        if match:
+            ttl = min(ttl, int(match.group(1)) - now - SIGNED_URL_EXPIRY_MARGIN_SECONDS)
+    return ttl
+
+async def extract_video_info(url: str, profile: str = "default", process: bool = True) -> dict:
+    """Fetch YouTube video metadata using the yt-dlp worker pool."""
     try:
-        ydl_opts = {
-    "quiet": True,
-    "no_warnings": True,
-    "cookiefile": COOKIES_PATH,
-    "headers": {
-        "User-Agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Mobile Safari/537.36"
-    }
-}
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            return ydl.extract_info(url, download=False)
+        info = await ytdlp_pool.extract_info(url, profile, process)
     except Exception as e:
         logger.error(f"Failed to fetch video info: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch video metadata.")
+    if not info:
+        raise HTTPException(status_code=404, detail="Video not found")
+    return info
 
-def format_video_metadata(raw_info: dict) -> YoutubeVideoMetadata:
-    """Format YouTube metadata into a structured schema."""
-    thumbnails = [
+async def get_video_info(url: str) -> dict:
+    """
+    Return YouTube video metadata, served from the metadata cache when possible.
+
+    The cache is keyed by video id so every URL form of a video shares one entry.
+    The returned dict is shared with other requests and must not be mutated.
+    """
+    video_id = extract_video_id(url)
+    key = f"video:{video_id}" if video_id else f"url:{url}"
+    return await metadata_cache.get_or_load(
+        key, lambda: extract_video_info(url), ttl=metadata_ttl
+    )
+
+async def get_video_details(url: str) -> dict:
+    """
+    Return YouTube video metadata without formats, served from the metadata cache when possible.
+
+    A cached full extraction is used when there is one. Otherwise the video is
+    extracted with the details profile and without processing, which skips
+    the player JS, the stream manifests and format selection. The result holds
+    no signed URLs, so it is cached for the full metadata TTL.
+    """
+    video_id = extract_video_id(url)
+    key = f"video:{video_id}" if video_id else f"url:{url}"
+    info = await run_in_threadpool(metadata_cache.get, key)
+    if info is not None:
+        return info
+    return await metadata_cache.get_or_load(
+        f"details:{key}", lambda: extract_video_info(url, profile="details", process=False)
+    )
+
+def format_thumbnails(raw_info: dict) -> List[VideoThumbnail]:
+    return [
         VideoThumbnail(
             url=thumb.get("url"),
             width=thumb.get("width"),
@@ -296,6 +387,9 @@ def format_video_metadata(raw_info: dict) -> YoutubeVideoMetadata:
         )
         for thumb in raw_info.get("thumbnails", [])
     ]
+
+def format_video_formats(raw_info: dict) -> List[VideoFormat]:
+    """One format per available video height, tallest first."""
     video_qualities = []
     seen_qualities = set()
     for fmt in raw_info.get("formats", []):
@@ -314,73 +408,707 @@ def format_video_metadata(raw_info: dict) -> YoutubeVideoMetadata:
                     height=fmt.get("height"),
                 ))
     video_qualities.sort(key=lambda x: int(x.resolution[:-1]), reverse=True)
+    return video_qualities
+
+def video_thumbnail(raw_info: dict) -> Optional[str]:
+    """
+    yt-dlp's best thumbnail when a full extraction picked one, else the hqdefault image.
+
+    Only processing picks the best thumbnail, so the oEmbed and details
+    paths fall back to hqdefault, which every video has.
+    """
+    if raw_info.get("thumbnail"):
+        return raw_info["thumbnail"]
+    video_id = raw_info.get("id")
+    return YOUTUBE_THUMBNAIL_URL.format(video_id) if video_id else None
+
+# How each YoutubeVideoMetadata field is built from a yt-dlp info dict.
+VIDEO_FIELD_BUILDERS: Dict[str, Callable[[dict], Any]] = {
+    "id": lambda raw_info: raw_info.get("id", ""),
+    "title": lambda raw_info: raw_info.get("title", "Unknown Title"),
+    "description": lambda raw_info: raw_info.get("description", ""),
+    "upload_date": lambda raw_info: datetime.strptime(raw_info.get("upload_date", "19700101"), "%Y%m%d").strftime("%Y-%m-%d"),
+    "duration": lambda raw_info: raw_info.get("duration", 0),
+    "view_count": lambda raw_info: raw_info.get("view_count", 0),
+    "like_count": lambda raw_info: raw_info.get("like_count"),
+    "thumbnail": video_thumbnail,
+    "thumbnails": format_thumbnails,
+    "formats": format_video_formats,
+}
+
+# Fields the oEmbed endpoint can answer without running yt-dlp at all.
+OEMBED_FIELDS = {"id", "title", "thumbnail"}
+# Fields a details extraction can answer; formats and the sorted thumbnail list need a full one.
+DETAIL_FIELDS = set(VIDEO_FIELD_BUILDERS) - {"formats", "thumbnails"}
+
+def format_video_metadata(raw_info: dict) -> YoutubeVideoMetadata:
+    """Format YouTube metadata into a structured schema."""
     return YoutubeVideoMetadata(
-        id=raw_info.get("id", ""),
-        title=raw_info.get("title", "Unknown Title"),
-        description=raw_info.get("description", ""),
-        upload_date=datetime.strptime(raw_info.get("upload_date", "19700101"), "%Y%m%d").strftime("%Y-%m-%d"),
-        duration=raw_info.get("duration", 0),
-        view_count=raw_info.get("view_count", 0),
-        like_count=raw_info.get("like_count"),
-        thumbnail=raw_info.get("thumbnail"),
-        thumbnails=thumbnails,
-        formats=video_qualities,
+        **{name: build(raw_info) for name, build in VIDEO_FIELD_BUILDERS.items()}
+    )
+
+def project_video_metadata(raw_info: dict, fields: List[str]) -> dict:
+    """Build only the requested metadata fields, skipping the models nobody asked for."""
+    return jsonable_encoder({name: VIDEO_FIELD_BUILDERS[name](raw_info) for name in fields})
+
+def fetch_oembed(video_id: str) -> Optional[dict]:
+    """
+    Look a video up through YouTube's oEmbed endpoint (blocking).
+
+    Returns None when oEmbed cannot describe the video, e.g. when embedding is
+    disabled, so the caller can fall back to a full extraction.
+    """
+    response = requests.get(
+        YOUTUBE_OEMBED_URL,
+        params={"url": f"https://www.youtube.com/watch?v={video_id}", "format": "json"},
+        timeout=10,
+    )
+    if response.status_code == 404:
+        raise HTTPException(status_code=404, detail="Video not found")
+    if response.status_code != 200:
+        logger.info(f"oEmbed returned {response.status_code} for {video_id}, falling back to yt-dlp")
+        return None
+    data = response.json()
+    return {"id": video_id, "title": data.get("title"), "thumbnail": video_thumbnail({"id": video_id})}
+
+async def get_video_preview(video_id: str) -> Optional[dict]:
+    """Return the cached oEmbed preview (id, title, thumbnail) of a video."""
+    return await metadata_cache.get_or_load(
+        f"oembed:{video_id}",
+        lambda: run_in_threadpool(fetch_oembed, video_id),
+        ttl=lambda preview: settings.METADATA_CACHE_TTL_SECONDS if preview else 0,
     )
 
 @router.get("/video/metadata")
-async def youtube_metadata(url: str) -> YoutubeVideoMetadata:
+async def youtube_metadata(
+    url: str,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated fields to return, e.g. 'title,thumbnail'. "
+        "Requests limited to id, title and thumbnail skip yt-dlp entirely, and "
+        "requests without formats or thumbnails skip format resolution.",
+    ),
+) -> YoutubeVideoMetadata:
     """Fetch and return YouTube video metadata."""
-   
-    raw_info = get_video_info(url)
-    return format_video_metadata(raw_info)
+    try:
+        requested = utils.parse_fields(fields, VIDEO_FIELD_BUILDERS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if requested is None:
+        raw_info = await get_video_info(url)
+        return await run_in_threadpool(format_video_metadata, raw_info)
+
+    video_id = extract_video_id(url)
+    if video_id and OEMBED_FIELDS.issuperset(requested):
+        try:
+            preview = await get_video_preview(video_id)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.warning(f"oEmbed lookup for {video_id} failed: {e}")
+            preview = None
+        if preview:
+            return JSONResponse({name: preview[name] for name in requested})
+
+    if DETAIL_FIELDS.issuperset(requested):
+        raw_info = await get_video_details(url)
+    else:
+        raw_info = await get_video_info(url)
+    return JSONResponse(await run_in_threadpool(project_video_metadata, raw_info, requested))
+
+def encode_playlist_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode()
+
+def decode_playlist_cursor(cursor: Optional[str]) -> int:
+    """Return the playlist offset a cursor points at (0 without a cursor)."""
+    if not cursor:
+        return 0
+    try:
+        offset = int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["offset"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return offset
+
+def iter_playlist(url: str, offset: int, limit: int) -> Iterator[Union[PlaylistInfo, PlaylistEntry]]:
+    """
+    Blocking generator over one page of a playlist or channel.
 
-def download_youtube_video_backend(url: str, quality: str) -> str:
+    The result is not processed by yt-dlp, so `entries` stays the extractor's
+    lazy generator: YouTube pages are only requested as entries are consumed,
+    and nothing past `offset + limit` is fetched. Yields the playlist first,
+    then up to `limit + 1` entries; the extra one tells the caller whether
+    another page exists.
+    """
+    import yt_dlp  # Deferred: importing yt_dlp is a large part of boot time
+
+    with yt_dlp.YoutubeDL(YTDL_PROFILES["flat"]) as ydl:
+        info = ydl.extract_info(url, download=False, process=False)
+        for _ in range(MAX_PLAYLIST_REDIRECTS):
+            if not info or info.get("_type") not in ("url", "url_transparent"):
+                break
+            info = ydl.extract_info(info["url"], download=False, process=False, ie_key=info.get("ie_key"))
+        if not info or info.get("_type") != "playlist":
+            raise HTTPException(status_code=404, detail="Playlist not found")
+        yield PlaylistInfo(
+            id=info.get("id"),
+            title=info.get("title"),
+            uploader=info.get("uploader") or info.get("channel"),
+            webpage_url=info.get("webpage_url"),
+        )
+        entries = itertools.islice(info.get("entries") or [], offset, offset + limit + 1)
+        for index, entry in enumerate(entries, start=offset):
+            thumbnails = entry.get("thumbnails") or []
+            yield PlaylistEntry(
+                index=index,
+                id=entry.get("id"),
+                title=entry.get("title"),
+                url=entry.get("url"),
+                duration=entry.get("duration"),
+                channel=entry.get("channel") or entry.get("uploader"),
+                view_count=entry.get("view_count"),
+                thumbnail=thumbnails[-1].get("url") if thumbnails else None,
+            )
+
+async def add_full_metadata(entry: PlaylistEntry) -> PlaylistEntry:
+    """Attach full video metadata to a playlist entry, recording failures on the entry."""
+    try:
+        async with playlist_metadata_slots:
+            raw_info = await get_video_info(entry.url or entry.id)
+        entry.metadata = await run_in_threadpool(format_video_metadata, raw_info)
+    except HTTPException as e:
+        entry.error = str(e.detail)
+    except Exception as e:
+        logger.error(f"Failed to fetch metadata for playlist entry {entry.id}: {e}")
+        entry.error = "Failed to fetch video metadata."
+    return entry
+
+@router.get("/playlist")
+async def youtube_playlist(
+    url: str = Query(...),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    limit: int = Query(settings.PLAYLIST_PAGE_SIZE, ge=1, le=1000),
+    full: bool = Query(False, description="Fetch full metadata for every entry (much slower)"),
+) -> StreamingResponse:
+    """
+    List a playlist or channel as NDJSON without resolving its videos.
+
+    The first line describes the playlist, then one line per entry in playlist
+    order as soon as it is read, and a final line with `next_cursor` for the
+    next page. Entries come from flat extraction; with `full=true` each entry
+    also carries its full metadata, fetched a few at a time while keeping the
+    playlist order.
+    """
+    offset = decode_playlist_cursor(cursor)
+    entries = iterate_in_thread(lambda: iter_playlist(url, offset, limit))
+    try:
+        # Read the playlist itself before responding so lookup errors keep their status code.
+        playlist = await entries.__anext__()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to fetch playlist {url}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch playlist.")
+
+    async def stream() -> AsyncIterator[str]:
+        window: deque = deque()
+        returned = 0
+        next_offset = None
+        try:
+            yield playlist.model_dump_json() + "\n"
+            try:
+                async for entry in entries:
+                    if entry.index >= offset + limit:
+                        next_offset = entry.index
+                        break
+                    if not full:
+                        returned += 1
+                        yield entry.model_dump_json() + "\n"
+                        continue
+                    window.append(asyncio.create_task(add_full_metadata(entry)))
+                    if len(window) >= settings.PLAYLIST_FULL_METADATA_CONCURRENCY:
+                        returned += 1
+                        yield (await window.popleft()).model_dump_json() + "\n"
+            except Exception as e:
+                # End the page early; the cursor resumes after the last entry read.
+                logger.error(f"Playlist listing of {url} stopped early: {e}")
+                next_offset = offset + returned + len(window)
+            while window:
+                returned += 1
+                yield (await window.popleft()).model_dump_json() + "\n"
+            end = PlaylistPageEnd(
+                count=returned,
+                next_cursor=encode_playlist_cursor(next_offset) if next_offset is not None else None,
+            )
+            yield end.model_dump_json() + "\n"
+        finally:
+            for task in window:
+                task.cancel()
+            await entries.aclose()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def signed_url_expiry(url: str) -> Optional[datetime]:
+    """Return when a signed googlevideo URL expires, if it says so."""
+    match = SIGNED_URL_EXPIRE_PATTERN.search(url or "")
+    return datetime.utcfromtimestamp(int(match.group(1))) if match else None
+
+def parse_clip(start: Optional[float], end: Optional[float]) -> Optional[Tuple[float, float]]:
+    """Turn the `start`/`end` query values into a (start, end) clip; None means the whole video."""
+    if start is None and end is None:
+        return None
+    clip = (start or 0.0, end if end is not None else math.inf)
+    if clip[1] <= clip[0]:
+        raise HTTPException(status_code=400, detail="end must be greater than start.")
+    return clip
+
+def format_clip(clip: Tuple[float, float]) -> str:
+    """Clip bounds in seconds, e.g. "30-60" or "30-inf"."""
+    return f"{clip[0]:g}-{clip[1]:g}"
+
+def download_variant(
+    quality: str, transcode: bool = False, clip: Optional[Tuple[float, float]] = None
+) -> str:
+    """Download store variant for a quality and clip, e.g. "720", "720:h264" or "720:30-60"."""
+    height = parse_height(quality)
+    variant = f"{height}:h264" if transcode else str(height)
+    return f"{variant}:{format_clip(clip)}" if clip else variant
+
+def audio_variant(audio_format: str) -> str:
+    """Download store variant for an audio-only download, e.g. "audio:mp3"."""
+    return f"audio:{audio_format}"
+
+def download_progress_hook(
+    report: Callable[..., None], expected_sizes: Dict[str, Optional[int]]
+) -> Callable[[dict], None]:
+    """
+    Build a yt-dlp progress hook that reports bytes summed over all streams.
+
+    `expected_sizes` maps the format id of every stream to its size, if known.
+    A total is only reported once the size of every stream is known.
+    """
+    finished_sizes: Dict[str, int] = {}
+
+    def track_download(status: dict) -> None:
+        if status["status"] not in ("downloading", "finished"):
+            return
+        format_id = (status.get("info_dict") or {}).get("format_id")
+        stream_total = status.get("total_bytes") or status.get("total_bytes_estimate")
+        if status["status"] == "finished":
+            finished_sizes[format_id] = status.get("downloaded_bytes") or stream_total or 0
+        done_before = sum(size for fid, size in finished_sizes.items() if fid != format_id)
+        pending = [size for fid, size in expected_sizes.items() if fid != format_id and fid not in finished_sizes]
+        total = None
+        if stream_total and all(pending):
+            total = int(done_before + stream_total + sum(pending))
+        report(
+            "downloading",
+            force=status["status"] == "finished",
+            downloaded_bytes=int(done_before + (status.get("downloaded_bytes") or 0)),
+            total_bytes=total,
+            speed=status.get("speed"),
+            eta=status.get("eta"),
+            format_id=format_id,
+        )
+
+    return track_download
+
+def download_youtube_video_backend(
+    url: str,
+    quality: str,
+    info: dict,
+    transcode: bool = False,
+    progress: Optional[Callable[..., None]] = None,
+    clip: Optional[Tuple[float, float]] = None,
+) -> StoredFile:
     """
     Download YouTube video with yt-dlp automatically merging video & audio.
-    The final file will be named after the video title.
+
+    The already extracted `info` is reused so yt-dlp does not resolve the page a
+    second time, and the formats closest to the requested height are chosen up
+    front, preferring MP4-compatible codecs. Streams of known size are fetched
+    as byte-range fragments over several connections. Video and audio are
+    merged with a stream copy; a re-encode to H.264/AAC only happens when `transcode` is set
+    and the chosen streams are not H.264/AAC already. The result is published to
+    the download store together with a report of how it was produced.
+
+    With a `clip` of (start, end) seconds only that time range is fetched: yt-dlp
+    hands it to ffmpeg, which seeks with range requests and stream-copies from
+    the keyframe at or before `start`, so the clip may begin slightly early.
+
+    `progress` (a ProgressReporter) receives the download, merge and transcode
+    phases from yt-dlp's hooks; byte counts cover all chosen streams.
     """
-    # First, get video metadata to determine the title.
-    info = get_video_info(url)
-    title = info.get("title", "video")
-    # It is advisable to sanitize the title if needed (yt-dlp with restrict_filenames can help)
-    final_output = f"{title}.mp4"
-    output_path = os.path.join(DOWNLOADS_FOLDER, final_output)
+    import yt_dlp  # Deferred: importing yt_dlp is a large part of boot time
+
+    key = download_store.make_key(info["id"], download_variant(quality, transcode, clip))
+    stored = download_store.lookup(key)
+    if stored:
+        return stored
+    if clip and info.get("duration") and clip[0] >= info["duration"]:
+        raise HTTPException(status_code=400, detail="The clip starts after the end of the video.")
+
+    formats = select_stream_formats(info, quality)
+    # Fetch the chosen streams as byte-range fragments over several connections.
+    # Clips are left to ffmpeg, which only requests the ranges it seeks to.
+    segmented_info = info if clip else segment_formats(
+        info, {fmt["format_id"] for fmt in formats}, settings.SEGMENTED_FETCH_SEGMENT_BYTES
+    )
+    merge = {"started": 0.0, "seconds": 0.0}
+    # Stream sizes say nothing about the size of a clip.
+    expected_sizes = {} if clip else {
+        fmt["format_id"]: fmt.get("filesize") or fmt.get("filesize_approx") for fmt in formats
+    }
+
+    def report(phase: str, force: bool = False, **fields) -> None:
+        if progress:
+            progress(phase, force=force, **fields)
 
+    def track_merge(status: dict) -> None:
+        if status.get("postprocessor") != "Merger":
+            return
+        if status["status"] == "started":
+            merge["started"] = time.monotonic()
+            report("merging", force=True)
+        elif status["status"] == "finished":
+            merge["seconds"] = time.monotonic() - merge["started"]
+
+    workspace = download_store.create_workspace()
     ydl_opts = {
-        "format": f"bv*[height={quality}]+ba/b",
-        "paths": {"home": DOWNLOADS_FOLDER},
-        # Use the title-based template so the merged file is named after the video title.
-        "outtmpl": os.path.join("%(title)s.%(ext)s"),
+        "format": "+".join(fmt["format_id"] for fmt in formats),
+        # Keep every intermediate (.part, fragments, merge temp files) inside the workspace.
+        "paths": {"home": workspace, "temp": workspace},
+        "outtmpl": "%(id)s.%(ext)s",
+        # The merger stream-copies; no FFmpegVideoConvertor re-encode.
         "merge_output_format": "mp4",
-        "postprocessors": [
-            {
-                "key": "FFmpegVideoConvertor",
-                "preferedformat": "mp4",
-            }
-        ],
-        # Optionally, restrict filenames to ASCII-compatible characters:
-        "restrict_filenames": True,
+        "concurrent_fragment_downloads": settings.SEGMENTED_FETCH_CONNECTIONS,
+        "fragment_retries": settings.SEGMENTED_FETCH_RETRIES,
+        # Progress goes to the job's progress channel instead of the console.
+        "quiet": True,
+        "noprogress": True,
+        "progress_hooks": [download_progress_hook(report, expected_sizes)],
+        "postprocessor_hooks": [track_merge],
     }
+    if clip:
+        ydl_opts["download_ranges"] = yt_dlp.utils.download_range_func(None, [clip])
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        if os.path.exists(output_path):
-            return output_path
-        else:
+            try:
+                # process_ie_result mutates the dict, and `info` is shared through the cache.
+                ydl.process_ie_result(copy.deepcopy(segmented_info), download=True)
+            except yt_dlp.utils.DownloadError as e:
+                logger.warning(f"Download from cached info failed ({e}), extracting {url} again")
+                ydl.download([url])
+        output_path = os.path.join(workspace, f"{info['id']}.mp4")
+        if not os.path.exists(output_path):
             raise HTTPException(status_code=404, detail="Video download failed.")
+
+        processing = ProcessingReport(
+            mode="remux",
+            video_codec=next((codec_family(f.get("vcodec")) for f in formats if has_video(f)), None),
+            audio_codec=next((codec_family(f.get("acodec")) for f in formats if has_audio(f)), None),
+            seconds=round(merge["seconds"], 3),
+        )
+        if transcode and not is_mp4_compatible(formats, video_codecs=("avc1",)):
+            transcoded_path = os.path.join(workspace, f"{info['id']}.h264.mp4")
+            started = time.monotonic()
+            report("transcoding", force=True)
+            transcoder.to_h264(output_path, transcoded_path)
+            output_path = transcoded_path
+            processing = ProcessingReport(
+                mode="transcode",
+                video_codec="avc1",
+                audio_codec="mp4a",
+                seconds=round(time.monotonic() - started, 3),
+            )
+        logger.info(f"Downloaded {info['id']}: {processing.mode} took {processing.seconds}s")
+
+        title = utils.sanitize_filename(info.get('title') or 'video')
+        filename = f"{title}_{format_clip(clip)}.mp4" if clip else f"{title}.mp4"
+        return download_store.publish(
+            key, output_path, filename, "video/mp4", report=processing.model_dump()
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error downloading video: {e}")
         raise HTTPException(status_code=500, detail="Error downloading video.")
+    finally:
+        download_store.discard_workspace(workspace)
+
+def download_youtube_audio_backend(
+    url: str,
+    audio_format: str,
+    info: dict,
+    progress: Optional[Callable[..., None]] = None,
+) -> StoredFile:
+    """
+    Download only the best audio stream of a YouTube video as `audio_format`.
+
+    No video bytes are fetched. The audio stream is picked from the already
+    extracted `info`, preferring one whose codec fits the output container: an
+    AAC stream is kept as is for m4a and an Opus stream is only remuxed for
+    opus. Anything else is encoded under the transcoder's concurrency cap.
+    """
+    import yt_dlp  # Deferred: importing yt_dlp is a large part of boot time
+
+    key = download_store.make_key(info["id"], audio_variant(audio_format))
+    stored = download_store.lookup(key)
+    if stored:
+        return stored
+
+    output = AUDIO_OUTPUTS[audio_format]
+    fmt = select_audio_format(info.get("formats") or [], codecs=(output["codec"],))
+    if not fmt:
+        raise HTTPException(status_code=404, detail="No audio-only formats available.")
+
+    def report(phase: str, force: bool = False, **fields) -> None:
+        if progress:
+            progress(phase, force=force, **fields)
+
+    segmented_info = segment_formats(info, {fmt["format_id"]}, settings.SEGMENTED_FETCH_SEGMENT_BYTES)
+    workspace = download_store.create_workspace()
+    ydl_opts = {
+        "format": fmt["format_id"],
+        "paths": {"home": workspace, "temp": workspace},
+        "outtmpl": "%(id)s.%(ext)s",
+        "concurrent_fragment_downloads": settings.SEGMENTED_FETCH_CONNECTIONS,
+        "fragment_retries": settings.SEGMENTED_FETCH_RETRIES,
+        "quiet": True,
+        "noprogress": True,
+        "progress_hooks": [
+            download_progress_hook(report, {fmt["format_id"]: fmt.get("filesize") or fmt.get("filesize_approx")})
+        ],
+    }
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            try:
+                ydl.process_ie_result(copy.deepcopy(segmented_info), download=True)
+            except yt_dlp.utils.DownloadError as e:
+                logger.warning(f"Audio download from cached info failed ({e}), extracting {url} again")
+                ydl.download([url])
+        source_path = os.path.join(workspace, f"{info['id']}.{fmt['ext']}")
+        if not os.path.exists(source_path):
+            raise HTTPException(status_code=404, detail="Audio download failed.")
+
+        codec_args = audio_codec_args(fmt, audio_format)
+        started = time.monotonic()
+        if codec_args == ["-c:a", "copy"] and fmt["ext"] == output["ext"]:
+            output_path, mode = source_path, "passthrough"
+        else:
+            output_path = os.path.join(workspace, f"{info['id']}.audio.{output['ext']}")
+            mode = "remux" if codec_args == ["-c:a", "copy"] else "transcode"
+            if mode == "transcode":
+                report("transcoding", force=True)
+            transcoder.to_audio(source_path, output_path, codec_args, output["muxer"])
+        processing = ProcessingReport(
+            mode=mode,
+            audio_codec=output["codec"],
+            seconds=round(time.monotonic() - started, 3),
+        )
+        logger.info(f"Downloaded audio of {info['id']}: {processing.mode} took {processing.seconds}s")
+
+        filename = f"{utils.sanitize_filename(info.get('title') or 'audio')}.{output['ext']}"
+        return download_store.publish(
+            key, output_path, filename, output["media_type"], report=processing.model_dump()
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error downloading audio: {e}")
+        raise HTTPException(status_code=500, detail="Error downloading audio.")
+    finally:
+        download_store.discard_workspace(workspace)
+
+@router.get("/cache/stats")
+async def youtube_cache_stats() -> dict:
+    """Return hit, miss and coalesce counters for the metadata cache."""
+    return metadata_cache.stats()
+
+@router.post("/video/download", status_code=202, response_model=None)
+async def download_video(
+    response: Response,
+    url: str = Query(...),
+    quality: str = Query("720"),
+    transcode: bool = Query(False, description="Re-encode to H.264/AAC instead of a stream copy"),
+    delivery: Literal["file", "direct", "redirect"] = Query(
+        "file",
+        description="'direct' returns the signed upstream URL and 'redirect' sends a 302 to it "
+        "when the chosen quality is a progressive (audio + video) format",
+    ),
+    start: Optional[float] = Query(None, ge=0, description="Clip start in seconds"),
+    end: Optional[float] = Query(None, gt=0, description="Clip end in seconds"),
+) -> Union[DownloadJob, DirectLink, RedirectResponse]:
+    """
+    Queue a YouTube download and return the job to poll for the file.
+
+    With `delivery` set to "direct" or "redirect", progressive formats are handed
+    to the client as signed upstream URLs so the bytes never pass through this
+    server. A job is only queued when separate streams have to be merged here.
 
-@router.post("/video/download")
-async def download_video(request: Request,
-                        #  background_tasks:BackgroundTask,
-                           url: str = Query(...), quality: str = Query("720")):
-    """Download and serve the YouTube video, then delete it after serving."""
-    file_path = download_youtube_video_backend(url, quality)
-    if not file_path:
-        raise HTTPException(status_code=404, detail="Video not found or failed to download.")
-
-    response = FileResponse(file_path, media_type="video/mp4", filename=os.path.basename(file_path))
-    request.app.add_event_handler("shutdown", lambda: os.remove(file_path))
-    return response
\ No newline at end of file
+    `start` and/or `end` limit the download to that time range; clips are cached
+    separately from the full video.
+    """
+    clip = parse_clip(start, end)
+    if delivery != "file" and not transcode and not clip:
+        info = await get_video_info(url)
+        formats = select_stream_formats(info, quality)
+        if len(formats) == 1 and has_audio(formats[0]):
+            fmt = formats[0]
+            if delivery == "redirect":
+                return RedirectResponse(fmt["url"], status_code=302)
+            response.status_code = 200
+            return DirectLink(
+                format_id=fmt["format_id"],
+                url=fmt["url"],
+                expires_at=signed_url_expiry(fmt["url"]),
+                resolution=f"{fmt['height']}p",
+                ext=fmt.get("ext"),
+                filesize=fmt.get("filesize"),
+                http_headers=fmt.get("http_headers") or {},
+            )
+
+    async def work(job: DownloadJob) -> StoredFile:
+        info = await get_video_info(url)
+        return await download_job_manager.run_blocking(
+            download_youtube_video_backend,
+            url,
+            quality,
+            info,
+            transcode,
+            download_job_manager.progress_reporter(job),
+            clip,
+        )
+
+    video_id = extract_video_id(url)
+    key = download_store.make_key(video_id, download_variant(quality, transcode, clip)) if video_id else None
+    return download_job_manager.submit(url, quality, work, key=key)
+
+@router.get("/video/stream")
+async def stream_video(url: str = Query(...), quality: str = Query("720")) -> StreamingResponse:
+    """
+    Stream the video as fragmented MP4 while ffmpeg muxes it, without staging it on disk.
+    """
+    info = await get_video_info(url)
+    input_formats = select_stream_formats(info, quality)
+    map_args = ["-map", "0:v:0", "-map", "1:a:0"] if len(input_formats) > 1 else ["-map", "0"]
+    stream = await ffmpeg_streamer.open(
+        input_formats, [*map_args, "-c", "copy", *FRAGMENTED_MP4_ARGS]
+    )
+    filename = f"{utils.sanitize_filename(info.get('title') or 'video')}.mp4"
+    return StreamingResponse(
+        stream,
+        media_type="video/mp4",
+        # The output is produced live, so byte ranges cannot be served.
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Accept-Ranges": "none"},
+    )
+
+@router.post("/audio/download", status_code=202)
+async def download_audio(
+    url: str = Query(...),
+    audio_format: Literal["m4a", "mp3", "opus"] = Query("m4a", alias="format"),
+) -> DownloadJob:
+    """
+    Queue an audio-only download; poll and fetch it through the video job endpoints.
+    """
+    async def work(job: DownloadJob) -> StoredFile:
+        info = await get_video_info(url)
+        return await download_job_manager.run_blocking(
+            download_youtube_audio_backend,
+            url,
+            audio_format,
+            info,
+            download_job_manager.progress_reporter(job),
+        )
+
+    video_id = extract_video_id(url)
+    key = download_store.make_key(video_id, audio_variant(audio_format)) if video_id else None
+    return download_job_manager.submit(url, audio_format, work, key=key)
+
+@router.get("/audio/stream", response_model=None)
+async def stream_audio(
+    url: str = Query(...),
+    audio_format: Literal["m4a", "mp3", "opus"] = Query("m4a", alias="format"),
+) -> Union[FileResponse, StreamingResponse]:
+    """
+    Stream only the audio of a video, converting it on the fly when needed.
+
+    A copy already in the download store is served from disk instead.
+    """
+    video_id = extract_video_id(url)
+    stored = download_store.acquire(download_store.make_key(video_id, audio_variant(audio_format))) if video_id else None
+    if stored:
+        return StoredFileResponse(stored, download_store.release, filename=stored.filename)
+
+    info = await get_video_info(url)
+    output = AUDIO_OUTPUTS[audio_format]
+    fmt = select_audio_format(info.get("formats") or [], codecs=(output["codec"],))
+    if not fmt:
+        raise HTTPException(status_code=404, detail="No audio-only formats available.")
+    container_args = FRAGMENTED_MP4_ARGS if output["muxer"] == "mp4" else ["-f", output["muxer"]]
+    stream = await ffmpeg_streamer.open(
+        [fmt], ["-map", "0:a:0", "-vn", *audio_codec_args(fmt, audio_format), *container_args]
+    )
+    filename = f"{utils.sanitize_filename(info.get('title') or 'audio')}.{output['ext']}"
+    return StreamingResponse(
+        stream,
+        media_type=output["media_type"],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Accept-Ranges": "none"},
+    )
+
+@router.get("/video/download/{job_id}")
+async def download_job_status(job_id: str) -> DownloadJob:
+    """Return the current state of a download job."""
+    job = download_job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Download job not found.")
+    return job
+
+@router.get("/video/download/{job_id}/events")
+async def download_job_events(job_id: str) -> StreamingResponse:
+    """
+    Stream a download job's progress as Server-Sent Events.
+
+    The stream starts with the job's latest state, then sends a `progress`
+    event (a DownloadProgress) whenever it changes, throttled while bytes are
+    downloading, and closes after the `finished` or `failed` event.
+    """
+    progress = download_job_manager.subscribe(job_id, heartbeat=SSE_HEARTBEAT_SECONDS)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Download job not found.")
+
+    async def events() -> AsyncIterator[str]:
+        async for event in progress:
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: progress\ndata: {event.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.api_route("/video/download/{job_id}/file", methods=["GET", "HEAD"])
+async def download_job_file(job_id: str):
+    """
+    Serve the file produced by a finished download job.
+
+    FileResponse answers Range requests (single and multi-range, 206/416 and
+    If-Range) and sends Accept-Ranges, ETag and Last-Modified, so clients can
+    resume and players can seek. Store artifacts keep a stable mtime, which
+    keeps those validators stable between requests.
+    """
+    job = download_job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Download job not found.")
+    if job.status == "failed":
+        raise HTTPException(status_code=410, detail=job.error or "Download failed.")
+    if job.status != "finished":
+        raise HTTPException(status_code=409, detail="Download is not ready yet.")
+    stored = download_store.acquire(job.store_key)
+    if not stored:
+        raise HTTPException(status_code=410, detail="Download has expired, please request it again.")
+    return StoredFileResponse(stored, download_store.release, filename=stored.filename)
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, TimeoutError as FutureTimeoutError
+from typing import AsyncIterator, Callable, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+async def iterate_in_thread(
+    iterable_factory: Callable[[], Iterable[T]],
+    max_buffer: int = 16,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[T]:
+    """
+    Consume a blocking iterable from a worker thread as an async iterator.
+
+    At most `max_buffer` items are read ahead, so a slow consumer throttles the
+    producer instead of growing memory. When the consumer stops early (e.g. the
+    client disconnected), the producer thread stops after its current item.
+
+    Args:
+        iterable_factory: Called in the worker thread to create the iterable.
+        max_buffer: Maximum number of items produced but not yet consumed.
+        executor: Executor to run the producer in; defaults to the loop's.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffer)
+    stop = threading.Event()
+
+    def put(entry: tuple) -> bool:
+        while not stop.is_set():
+            future = asyncio.run_coroutine_threadsafe(queue.put(entry), loop)
+            try:
+                future.result(timeout=1)
+                return True
+            except FutureTimeoutError:
+                future.cancel()
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable_factory():
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((_DONE, e))
+            return
+        put((_DONE, None))
+
+    loop.run_in_executor(executor, produce)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _DONE:
+                if error:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
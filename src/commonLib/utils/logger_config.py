@@ -10,12 +10,12 @@ class LoggerConfig:
         self.log_dir = Path(log_dir) if log_dir else self.project_root / "logs"
         self.log_file_path = self.log_dir / log_file
 
-        # Ensure log directory exists
-        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._file_sinks_added = False
 
         self._configure_logger()
 
     def _configure_logger(self):
+        """Set up console logging; file sinks are added at startup by `add_file_sinks`."""
         try:
             logger.remove()  # Remove default handlers
             
@@ -30,6 +30,17 @@ class LoggerConfig:
                 level=os.getenv("LOG_LEVEL", "INFO"),
                 colorize=True,
             )
+        except Exception as e:
+            logger.error(f"Failed to configure logger: {e}")
+
+    def add_file_sinks(self):
+        """Add the file sinks. Runs once, at application startup, to keep imports cheap."""
+        if self._file_sinks_added:
+            return
+        self._file_sinks_added = True
+        try:
+            # Ensure log directory exists
+            self.log_dir.mkdir(parents=True, exist_ok=True)
 
             # General Application Logs
             logger.add(
@@ -72,9 +83,9 @@ class LoggerConfig:
             )
 
         except Exception as e:
-            logger.error(f"Failed to configure logger: {e}")
+            logger.error(f"Failed to add file log sinks: {e}")
 
 
-LoggerConfig()
+logger_config = LoggerConfig()
 
 logger = logger
@@ -1,5 +1,6 @@
 
 import re
+from typing import Iterable, List, Optional
 
 class Utils:
     @staticmethod
@@ -24,6 +25,28 @@ class Utils:
     @staticmethod
     def sanitize_filename(filename: str) -> str:
         return re.sub(r'[\\/*?:"<>|]', "", filename).strip()
+
+    @staticmethod
+    def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+        """Parse a comma separated `fields=` projection.
+
+        Args:
+            fields: Raw query value such as "title,thumbnail", or None
+            allowed: Field names that may be requested
+
+        Returns:
+            Optional[List[str]]: Requested field names in order, or None for all fields
+
+        Raises:
+            ValueError: If an unknown field is requested
+        """
+        if not fields:
+            return None
+        requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return requested or None
     
 
 utils = Utils()
\ No newline at end of file
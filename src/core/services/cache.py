@@ -0,0 +1,291 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from src.commonLib.utils.logger_config import logger
+from src.core.settings.configurations.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; loads are then only coalesced per process.
+    fcntl = None
+
+# Sentinel so that cached falsy values can be told apart from a miss.
+_MISS = object()
+# Temporary and lock files untouched for this long are left over from dead loads.
+STALE_FILE_SECONDS = 3600
+
+
+class TieredCache:
+    """
+    Two level TTL cache with single-flight loading.
+
+    L1 is an in-process LRU. L2 is a directory of JSON files that every worker
+    process on the host shares, written atomically so readers never see a
+    partial entry. Concurrent `get_or_load` calls for the same key in one
+    process share a single loader call, and a lock file in the L2 directory
+    lets only one process on the host load a key at a time; the others then
+    read its result from L2.
+    """
+
+    def __init__(
+        self, name: str, directory: str, max_entries: int, default_ttl: float, lock_timeout: float = 60
+    ):
+        self.name = name
+        self.directory = directory
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.lock_timeout = lock_timeout
+        self._l1: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "coalesced": 0}
+        self._janitor_task: Optional[asyncio.Task] = None
+        # L2 directories are created on first write, so importing a module
+        # that defines a cache never touches the disk.
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"name": self.name, "l1_entries": len(self._l1), **self._stats}
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def _get_l1(self, key: str) -> Any:
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return _MISS
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._l1[key]
+                return _MISS
+            self._l1.move_to_end(key)
+            return value
+
+    def _set_l1(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._l1[key] = (expires_at, value)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.max_entries:
+                self._l1.popitem(last=False)
+
+    def _read_l2(self, key: str) -> Tuple[Any, float]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return _MISS, 0
+        if entry["expires_at"] <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return _MISS, 0
+        return entry["value"], entry["expires_at"]
+
+    def _write_l2(self, key: str, value: Any, expires_at: float) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "expires_at": expires_at, "value": value}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"[{self.name}] Failed to write cache entry {key}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Optional[Any]:
+        """Blocking lookup through both levels; use from worker threads."""
+        value = self._get_l1(key)
+        if value is not _MISS:
+            self._count("l1_hits")
+            return value
+        value, expires_at = self._read_l2(key)
+        if value is not _MISS:
+            self._count("l2_hits")
+            self._set_l1(key, value, expires_at)
+            return value
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Blocking store into both levels. Non-positive TTLs are not cached."""
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        self._set_l1(key, value, expires_at)
+        self._write_l2(key, value, expires_at)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._l1.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def purge_expired(self) -> int:
+        """Remove expired L2 entries and stale temporary and lock files, returning how many were deleted."""
+        removed = 0
+        now = time.time()
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                path = os.path.join(root, filename)
+                try:
+                    if filename.endswith((".tmp", ".lock")):
+                        if os.path.getmtime(path) < now - STALE_FILE_SECONDS and self._remove_unlocked(path):
+                            removed += 1
+                        continue
+                    with open(path, "r", encoding="utf-8") as f:
+                        if json.load(f)["expires_at"] <= now:
+                            os.remove(path)
+                            removed += 1
+                except (OSError, ValueError, KeyError):
+                    continue
+        return removed
+
+    @staticmethod
+    def _remove_unlocked(path: str) -> bool:
+        """Remove a file unless another process holds its lock; a held lock file must stay in place."""
+        if fcntl is None or not path.endswith(".lock"):
+            os.remove(path)
+            return True
+        fd = os.open(path, os.O_RDWR)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            os.remove(path)
+            return True
+        finally:
+            os.close(fd)
+
+    async def _janitor(self, interval: int) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await run_in_threadpool(self.purge_expired)
+                if removed:
+                    logger.info(f"[{self.name}] Cache janitor removed {removed} files")
+            except Exception as e:
+                logger.error(f"[{self.name}] Cache janitor failed: {e}")
+
+    def start_janitor(self, interval: int = settings.CACHE_JANITOR_INTERVAL_SECONDS) -> None:
+        self._janitor_task = asyncio.create_task(self._janitor(interval))
+
+    async def stop_janitor(self) -> None:
+        if self._janitor_task:
+            self._janitor_task.cancel()
+            await asyncio.gather(self._janitor_task, return_exceptions=True)
+            self._janitor_task = None
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[Callable[[Any], float]] = None,
+    ) -> Any:
+        """
+        Return the cached value for `key`, calling `loader` on a miss.
+
+        `ttl` computes the lifetime from the loaded value, so entries can expire
+        together with whatever upstream data they embed.
+        """
+        value = self._get_l1(key)
+        if value is not _MISS:
+            self._count("l1_hits")
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count("coalesced")
+        else:
+            # The load runs detached, so a caller going away (e.g. a client
+            # disconnect) does not cancel it for the others waiting on it.
+            task = asyncio.ensure_future(self._load(key, loader, ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_load(key, done))
+        return await asyncio.shield(task)
+
+    def _finish_load(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception as retrieved when nobody was left waiting.
+            task.exception()
+
+    async def _load(
+        self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[Callable[[Any], float]]
+    ) -> Any:
+        value, expires_at = await run_in_threadpool(self._read_l2, key)
+        if value is not _MISS:
+            self._count("l2_hits")
+            self._set_l1(key, value, expires_at)
+            return value
+        lock_fd = await self._lock_key(key)
+        try:
+            if lock_fd is not None:
+                # Another process may have loaded the key while we waited for the lock.
+                value, expires_at = await run_in_threadpool(self._read_l2, key)
+                if value is not _MISS:
+                    self._count("l2_hits")
+                    self._set_l1(key, value, expires_at)
+                    return value
+            self._count("misses")
+            value = await loader()
+            lifetime = ttl(value) if ttl else self.default_ttl
+            await run_in_threadpool(self.set, key, value, lifetime)
+            return value
+        finally:
+            if lock_fd is not None:
+                os.close(lock_fd)
+
+    async def _lock_key(self, key: str) -> Optional[int]:
+        """
+        Take the host-wide lock for loading `key`, returning its file descriptor.
+
+        Returns None when file locks are unavailable or the lock was not
+        acquired within `lock_timeout`; the caller then loads without it.
+        """
+        if fcntl is None:
+            return None
+        path = self._path(key) + ".lock"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o644)
+        except OSError as e:
+            logger.warning(f"[{self.name}] Could not open lock file for {key}: {e}")
+            return None
+        deadline = time.monotonic() + self.lock_timeout
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        logger.warning(f"[{self.name}] Timed out waiting for another worker to load {key}")
+                        os.close(fd)
+                        return None
+                    await asyncio.sleep(0.05)
+        except BaseException:
+            os.close(fd)
+            raise
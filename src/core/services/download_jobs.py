@@ -0,0 +1,386 @@
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from src.commonLib.utils.logger_config import logger
+from src.core.services.download_store import StoredFile, download_store
+from src.core.services.progress import TERMINAL_PHASES, ProgressChannel, ProgressReporter
+from src.core.settings.configurations.config import settings
+from src.schemas.youtube_schema import DownloadJob, DownloadProgress, ProcessingReport
+
+JobWork = Callable[[DownloadJob], Awaitable[StoredFile]]
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+# A queued or running record not updated for this long belongs to a worker that died.
+STALE_JOB_SECONDS = 600
+# How often the records of queued and running jobs are touched, so they never look stale.
+RECORD_HEARTBEAT_SECONDS = 60
+# How often a worker that does not run a job re-reads its record for progress events.
+RECORD_POLL_SECONDS = 1.0
+# How often expired records are removed from the shared directory.
+RECORD_PURGE_INTERVAL_SECONDS = 60
+
+
+class JobRecords:
+    """
+    One JSON record per download job, next to the shared download store.
+
+    Every worker writes the records of the jobs it runs, so any worker can
+    answer status, events and file requests for any job, and a request for a
+    store key that another worker is already downloading joins that job.
+    Records are replaced atomically, so readers never see a partial one.
+    """
+
+    def __init__(self, root: str = os.path.join(settings.DOWNLOADS_DIR, "jobs")):
+        self.root = root
+        self.active_dir = os.path.join(root, "active")
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.root, f"{job_id}.json")
+
+    def _active_path(self, key: str) -> str:
+        return os.path.join(self.active_dir, key)
+
+    @staticmethod
+    def _write(path: str, data: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save(self, job: DownloadJob) -> None:
+        # store_key is never serialized to clients, but other workers need it to serve the file.
+        record = {**job.model_dump(mode="json"), "store_key": job.store_key}
+        try:
+            self._write(self._path(job.id), json.dumps(record))
+        except OSError as e:
+            logger.warning(f"Could not write record for download job {job.id}: {e}")
+
+    def load(self, job_id: str) -> Optional[DownloadJob]:
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        try:
+            with open(self._path(job_id), encoding="utf-8") as f:
+                return DownloadJob.model_validate(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def touch(self, job_id: str, key: Optional[str] = None) -> None:
+        """Refresh the modification time of a job's record and active marker."""
+        for path in (self._path(job_id), self._active_path(key) if key else None):
+            if path:
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+
+    def mark_active(self, key: str, job_id: str) -> None:
+        try:
+            self._write(self._active_path(key), job_id)
+        except OSError as e:
+            logger.warning(f"Could not mark download {key} as active: {e}")
+
+    def clear_active(self, key: str, job_id: str) -> None:
+        path = self._active_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                if f.read() == job_id:
+                    os.remove(path)
+        except OSError:
+            pass
+
+    def find_active(self, key: str) -> Optional[DownloadJob]:
+        """The queued or running job for `key` on any worker, unless its record went stale."""
+        try:
+            with open(self._active_path(key), encoding="utf-8") as f:
+                job_id = f.read()
+            if time.time() - os.path.getmtime(self._path(job_id)) > STALE_JOB_SECONDS:
+                return None
+        except OSError:
+            return None
+        job = self.load(job_id)
+        return job if job and job.status in ("queued", "running") else None
+
+    def purge(self, max_age: float) -> int:
+        """Remove records and active markers not updated for `max_age` seconds."""
+        cutoff = time.time() - max_age
+        removed = 0
+        for directory in (self.root, self.active_dir):
+            try:
+                entries = list(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+class DownloadJobManager:
+    """
+    Runs download jobs on a fixed number of workers behind a bounded queue.
+
+    Jobs are coroutines; their blocking parts (yt-dlp, ffmpeg) go through
+    `run_blocking`, which uses a dedicated thread pool sized to the number of
+    workers so downloads never occupy the event loop or the default threadpool.
+
+    Jobs submitted with a store key are deduplicated: an artifact that is
+    already in the download store finishes immediately, and a request for a
+    key that is already queued or running joins the existing job.
+
+    Every job has a progress channel: the manager publishes queue and
+    completion events to it, and the job's work publishes download progress
+    through `progress_reporter`.
+
+    Each state and progress change is also written to the job's record (see
+    JobRecords), so with several worker processes sharing DOWNLOADS_DIR, jobs
+    run by another process are served from their records and deduplicated
+    across processes too.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.DOWNLOAD_WORKERS,
+        queue_size: int = settings.DOWNLOAD_QUEUE_SIZE,
+        job_ttl_seconds: int = settings.DOWNLOAD_JOB_TTL_SECONDS,
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.job_ttl = timedelta(seconds=job_ttl_seconds)
+        self._jobs: Dict[str, DownloadJob] = {}
+        self._active: Dict[str, DownloadJob] = {}
+        self._channels: Dict[str, ProgressChannel] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self.records = JobRecords()
+        self._records_purged_at = 0.0
+        # Jobs whose latest state still has to be written, and the task writing each one's record.
+        self._unsaved: Dict[str, DownloadJob] = {}
+        self._record_writers: Dict[str, asyncio.Task] = {}
+        self._heartbeats: Dict[str, asyncio.Task] = {}
+
+    async def start(self) -> None:
+        """Start the worker tasks. Must be called from the running event loop."""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="download-worker"
+        )
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(index)) for index in range(self.workers)
+        ]
+        logger.info(
+            f"Download workers started (workers={self.workers}, queue_size={self.queue_size})"
+        )
+
+    async def stop(self) -> None:
+        """Cancel the workers and abandon any queued jobs."""
+        heartbeats, self._heartbeats = list(self._heartbeats.values()), {}
+        for task in self._worker_tasks + heartbeats:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, *heartbeats, return_exceptions=True)
+        # Let the last state changes reach the records.
+        await asyncio.gather(*self._record_writers.values(), return_exceptions=True)
+        self._worker_tasks = []
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Download workers stopped")
+
+    def submit(
+        self, url: str, quality: str, work: JobWork, key: Optional[str] = None
+    ) -> DownloadJob:
+        """Queue a job, raising 503 when the queue is already full."""
+        if self._queue is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Download workers are not running.",
+            )
+        self.prune()
+        if key:
+            existing = self._active.get(key) or self.records.find_active(key)
+            if existing:
+                return existing
+
+        job = DownloadJob(
+            id=uuid.uuid4().hex, url=url, quality=quality, created_at=datetime.utcnow()
+        )
+        stored = download_store.lookup(key) if key else None
+        if stored:
+            job.status = "finished"
+            job.store_key = stored.key
+            job.filename = stored.filename
+            job.processing = ProcessingReport.model_validate(stored.report) if stored.report else None
+            job.finished_at = job.created_at
+            self._jobs[job.id] = job
+            self._channels[job.id] = ProgressChannel()
+            self._publish(job, DownloadProgress(phase="finished", downloaded_bytes=stored.size, total_bytes=stored.size))
+            return job
+
+        try:
+            self._queue.put_nowait((job, work, key))
+        except asyncio.QueueFull:
+            logger.warning(f"Download queue full, rejecting job for {url}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Download queue is full, please retry later.",
+                headers={"Retry-After": "30"},
+            )
+        self._jobs[job.id] = job
+        self._channels[job.id] = ProgressChannel()
+        self._publish(job, DownloadProgress(phase="queued"))
+        if key:
+            self._active[key] = job
+            self.records.mark_active(key, job.id)
+        self._heartbeats[job.id] = asyncio.create_task(self._heartbeat(job.id, key))
+        return job
+
+    def get(self, job_id: str) -> Optional[DownloadJob]:
+        """A job run by this worker, or the record of one run by another worker."""
+        return self._jobs.get(job_id) or self.records.load(job_id)
+
+    def subscribe(
+        self, job_id: str, heartbeat: float
+    ) -> Optional[AsyncIterator[Optional[DownloadProgress]]]:
+        """
+        Progress events of a job, as ProgressChannel.subscribe yields them.
+
+        Jobs of another worker are followed by polling their record. Returns
+        None for an unknown job.
+        """
+        channel = self._channels.get(job_id)
+        if channel:
+            return channel.subscribe(heartbeat)
+        job = self.records.load(job_id)
+        if not job:
+            return None
+        return self._follow_record(job, heartbeat)
+
+    async def _follow_record(
+        self, job: DownloadJob, heartbeat: float
+    ) -> AsyncIterator[Optional[DownloadProgress]]:
+        latest = None
+        sent_at = time.monotonic()
+        while job:
+            if job.progress and job.progress != latest:
+                latest = job.progress
+                sent_at = time.monotonic()
+                yield latest
+                if latest.phase in TERMINAL_PHASES:
+                    return
+            elif time.monotonic() - sent_at >= heartbeat:
+                sent_at = time.monotonic()
+                yield None
+            await asyncio.sleep(RECORD_POLL_SECONDS)
+            job = await run_in_threadpool(self.records.load, job.id)
+
+    def progress_reporter(self, job: DownloadJob) -> ProgressReporter:
+        """A reporter that blocking download code can call from any thread."""
+        return ProgressReporter(lambda event: self._publish(job, event), asyncio.get_running_loop())
+
+    def _publish(self, job: DownloadJob, event: DownloadProgress) -> None:
+        job.progress = event
+        self._save_record(job)
+        channel = self._channels.get(job.id)
+        if channel:
+            channel.publish(event)
+
+    def _save_record(self, job: DownloadJob) -> None:
+        """
+        Write the job's record on a worker thread, off the event loop.
+
+        Each job has at most one write in flight. Changes made meanwhile are
+        collapsed into one more write of the latest state, so records never
+        go back in time and fast progress updates don't queue up writes.
+        """
+        self._unsaved[job.id] = job
+        if job.id not in self._record_writers:
+            self._record_writers[job.id] = asyncio.create_task(self._write_record(job.id))
+
+    async def _write_record(self, job_id: str) -> None:
+        try:
+            while job_id in self._unsaved:
+                await run_in_threadpool(self.records.save, self._unsaved.pop(job_id))
+        finally:
+            self._record_writers.pop(job_id, None)
+
+    async def _heartbeat(self, job_id: str, key: Optional[str]) -> None:
+        """Keep a queued or running job's record fresh, even when it reports no progress for long."""
+        while True:
+            await asyncio.sleep(RECORD_HEARTBEAT_SECONDS)
+            await run_in_threadpool(self.records.touch, job_id, key)
+
+    async def run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking call on the download thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def prune(self) -> None:
+        """Forget expired finished jobs; their files stay in the download store."""
+        now = time.monotonic()
+        if now - self._records_purged_at >= RECORD_PURGE_INTERVAL_SECONDS:
+            # Also covers records left by workers that exited.
+            self._records_purged_at = now
+            asyncio.ensure_future(run_in_threadpool(self.records.purge, self.job_ttl.total_seconds()))
+        cutoff = datetime.utcnow() - self.job_ttl
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._channels.pop(job_id, None)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job, work, key = await self._queue.get()
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            self._publish(job, DownloadProgress(phase="running"))
+            stored = None
+            try:
+                stored = await work(job)
+                job.store_key = stored.key
+                job.filename = stored.filename
+                job.processing = ProcessingReport.model_validate(stored.report) if stored.report else None
+                job.status = "finished"
+            except asyncio.CancelledError:
+                raise
+            except HTTPException as e:
+                job.status = "failed"
+                job.error = e.detail
+            except Exception as e:
+                logger.error(f"Download job {job.id} failed: {e}")
+                job.status = "failed"
+                job.error = "Error downloading video."
+            finally:
+                job.finished_at = datetime.utcnow()
+                heartbeat = self._heartbeats.pop(job.id, None)
+                if heartbeat:
+                    heartbeat.cancel()
+                self._queue.task_done()
+                if key:
+                    self._active.pop(key, None)
+                    await run_in_threadpool(self.records.clear_active, key, job.id)
+            if stored and job.status == "finished":
+                self._publish(job, DownloadProgress(phase="finished", downloaded_bytes=stored.size, total_bytes=stored.size))
+            else:
+                self._publish(job, DownloadProgress(phase="failed", error=job.error))
+            logger.info(f"Download job {job.id} {job.status} on worker {index}")
+
+
+download_job_manager = DownloadJobManager()
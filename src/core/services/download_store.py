@@ -0,0 +1,256 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+from src.commonLib.utils.logger_config import logger
+from src.core.settings.configurations.config import settings
+
+# Leftovers yt-dlp and ffmpeg produce when a download or merge is interrupted.
+ORPHAN_SUFFIXES = (".part", ".ytdl", ".temp", ".tmp")
+# Eviction frees space down to this share of the budget, so a full store is not walked on every publish.
+EVICTION_LOW_WATER = 0.9
+
+
+class StoredFile(BaseModel):
+    """A published artifact in the download store."""
+    key: str
+    path: str
+    filename: str
+    media_type: str
+    size: int
+    report: Optional[dict] = None  # How the artifact was produced
+
+
+class StoredFileResponse(FileResponse):
+    """
+    Serves an acquired artifact and always releases it afterwards.
+
+    FileResponse skips its `background` task when it answers a malformed (400)
+    or unsatisfiable (416) Range header, which would leave the artifact pinned
+    for good, so the release runs in a finally around the whole response.
+    """
+
+    def __init__(self, stored: StoredFile, release: Callable[[str], None], **kwargs: Any):
+        kwargs.setdefault("media_type", stored.media_type)
+        super().__init__(stored.path, **kwargs)
+        self.key = stored.key
+        self.release = release
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release(self.key)
+
+
+class DownloadStore:
+    """
+    Content-addressed store for finished downloads.
+
+    Artifacts are keyed by a hash of (video id, variant) and laid out as
+    objects/ab/cd/<key> with a JSON sidecar describing them. Downloads are
+    produced in a private workspace under tmp/ and published with an atomic
+    rename, so a half-written file is never visible. The store is kept under a
+    byte budget by evicting the least recently served artifacts; artifacts that
+    are currently being served by this process are never evicted.
+
+    The store's size is tracked as artifacts are published, so a publish only
+    walks the object tree when the budget is exceeded. Publishes by other
+    workers are not seen by this count; the janitor's periodic full walk
+    brings it back in line.
+    """
+
+    def __init__(
+        self,
+        root: str = settings.DOWNLOADS_DIR,
+        max_bytes: int = settings.DOWNLOAD_STORE_MAX_BYTES,
+        tmp_max_age_seconds: int = settings.DOWNLOAD_TMP_MAX_AGE_SECONDS,
+    ):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.tmp_dir = os.path.join(root, "tmp")
+        self.max_bytes = max_bytes
+        self.tmp_max_age_seconds = tmp_max_age_seconds
+        self._refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None  # Unknown until the first walk
+        self._janitor_task: Optional[asyncio.Task] = None
+        # Directories are created on first write (workspace or publish), so the
+        # module-level stores never touch the disk at import.
+
+    @staticmethod
+    def make_key(video_id: str, variant: str) -> str:
+        return hashlib.sha256(f"{video_id}:{variant}".encode()).hexdigest()
+
+    def _data_path(self, key: str) -> str:
+        return os.path.join(self.objects_dir, key[:2], key[2:4], key)
+
+    def _meta_path(self, key: str) -> str:
+        return self._data_path(key) + ".json"
+
+    def lookup(self, key: str) -> Optional[StoredFile]:
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as f:
+                stored = StoredFile(**json.load(f))
+        except (OSError, ValueError):
+            return None
+        return stored if os.path.exists(stored.path) else None
+
+    def acquire(self, key: str) -> Optional[StoredFile]:
+        """Look up an artifact and pin it against eviction until `release`."""
+        stored = self.lookup(key)
+        if stored is None:
+            return None
+        with self._lock:
+            self._refs[key] = self._refs.get(key, 0) + 1
+        try:
+            # Record the access in atime only; mtime stays stable for ETag/Last-Modified.
+            os.utime(stored.path, (time.time(), os.stat(stored.path).st_mtime))
+        except OSError:
+            pass
+        return stored
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            count = self._refs.get(key, 0) - 1
+            if count > 0:
+                self._refs[key] = count
+            else:
+                self._refs.pop(key, None)
+
+    def create_workspace(self) -> str:
+        """Create a private directory to produce a download in."""
+        path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+        os.makedirs(path)
+        return path
+
+    def discard_workspace(self, workspace: str) -> None:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    def publish(
+        self,
+        key: str,
+        source_path: str,
+        filename: str,
+        media_type: str,
+        report: Optional[dict] = None,
+    ) -> StoredFile:
+        """Atomically move a finished file into the store and enforce the budget."""
+        data_path = self._data_path(key)
+        previous = self.lookup(key)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        os.replace(source_path, data_path)
+        stored = StoredFile(
+            key=key,
+            path=data_path,
+            filename=filename,
+            media_type=media_type,
+            size=os.path.getsize(data_path),
+            report=report,
+        )
+        fd, tmp_meta = tempfile.mkstemp(dir=os.path.dirname(data_path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(stored.model_dump(), f)
+        os.replace(tmp_meta, self._meta_path(key))
+        logger.info(f"Published download {filename} ({stored.size} bytes) as {key}")
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += stored.size - (previous.size if previous else 0)
+            over_budget = self._total_bytes is None or self._total_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+        return stored
+
+    def evict(self) -> int:
+        """Walk the store and delete least recently served artifacts until it is back under budget."""
+        entries: List[tuple] = []
+        total = 0
+        for root, _, files in os.walk(self.objects_dir):
+            for filename in files:
+                if filename.endswith((".json", ".tmp")):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, filename, path))
+                total += stat.st_size
+
+        freed = 0
+        for _, size, key, path in sorted(entries):
+            if total - freed <= self.max_bytes * EVICTION_LOW_WATER:
+                break
+            with self._lock:
+                if self._refs.get(key):
+                    continue
+            for victim in (path + ".json", path):
+                try:
+                    os.remove(victim)
+                except OSError:
+                    pass
+            freed += size
+            logger.info(f"Evicted download {key} ({size} bytes)")
+        with self._lock:
+            self._total_bytes = total - freed
+        return freed
+
+    def clean_orphans(self) -> int:
+        """Remove abandoned workspaces and stray partial files."""
+        removed = 0
+        cutoff = time.time() - self.tmp_max_age_seconds
+        try:
+            names = os.listdir(self.tmp_dir)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            path = os.path.join(self.tmp_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+            except OSError:
+                continue
+        for root, _, files in os.walk(self.objects_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                try:
+                    if filename.endswith(ORPHAN_SUFFIXES) and os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    async def _janitor(self, interval: int) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await run_in_threadpool(self.clean_orphans)
+                freed = await run_in_threadpool(self.evict)
+                if removed or freed:
+                    logger.info(f"Download janitor removed {removed} orphans, freed {freed} bytes")
+            except Exception as e:
+                logger.error(f"Download janitor failed: {e}")
+
+    def start_janitor(self, interval: int = settings.DOWNLOAD_JANITOR_INTERVAL_SECONDS) -> None:
+        self._janitor_task = asyncio.create_task(self._janitor(interval))
+
+    async def stop_janitor(self) -> None:
+        if self._janitor_task:
+            self._janitor_task.cancel()
+            await asyncio.gather(self._janitor_task, return_exceptions=True)
+            self._janitor_task = None
+
+
+download_store = DownloadStore()
@@ -0,0 +1,115 @@
+import asyncio
+from typing import AsyncIterator, List
+
+from fastapi import HTTPException, status
+from src.commonLib.utils.logger_config import logger
+from src.core.settings.configurations.config import settings
+
+# Fragmented MP4 can be written to a pipe: the moov box comes first and media follows in fragments.
+FRAGMENTED_MP4_ARGS = [
+    "-movflags", "frag_keyframe+empty_moov+default_base_moof",
+    "-f", "mp4",
+]
+
+
+def build_input_args(fmt: dict) -> List[str]:
+    """ffmpeg input arguments for a yt-dlp format, including its required HTTP headers."""
+    args = []
+    headers = fmt.get("http_headers") or {}
+    if headers:
+        args += ["-headers", "".join(f"{name}: {value}\r\n" for name, value in headers.items())]
+    return args + ["-i", fmt["url"]]
+
+
+class FFmpegStreamer:
+    """
+    Runs ffmpeg with its output on a pipe and forwards the bytes as they arrive.
+
+    Nothing is staged on disk. The number of concurrent ffmpeg processes is
+    capped, and the process is killed as soon as the client goes away.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.STREAM_MAX_CONCURRENCY,
+        chunk_size: int = settings.STREAM_CHUNK_SIZE,
+    ):
+        self.chunk_size = chunk_size
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def open(self, input_formats: List[dict], output_args: List[str]) -> AsyncIterator[bytes]:
+        """
+        Start ffmpeg and return an iterator over its output.
+
+        The first chunk is read before returning so that upstream failures
+        surface as a 502 instead of an empty 200 response.
+        """
+        args = ["-hide_banner", "-loglevel", "error", "-nostdin"]
+        for fmt in input_formats:
+            args += build_input_args(fmt)
+        args += output_args + ["pipe:1"]
+
+        if self._slots.locked():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many streams in progress, please retry later.",
+                headers={"Retry-After": "10"},
+            )
+        await self._slots.acquire()
+        chunks = self._run(args)
+        try:
+            first_chunk = await chunks.__anext__()
+        except BaseException:
+            await chunks.aclose()
+            raise
+        return self._resume(first_chunk, chunks)
+
+    async def _run(self, args: List[str]) -> AsyncIterator[bytes]:
+        """
+        Run ffmpeg and yield its output.
+
+        The generator owns the process and the concurrency slot. Once started it
+        kills ffmpeg and frees the slot however it ends, including when it is
+        closed or garbage collected without being consumed.
+        """
+        process = None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ffmpeg",
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            first_chunk = await process.stdout.read(self.chunk_size)
+            if not first_chunk:
+                error = (await process.stderr.read()).decode(errors="replace").strip()
+                await process.wait()
+                logger.error(f"ffmpeg produced no output (exit {process.returncode}): {error}")
+                raise HTTPException(status_code=502, detail="Failed to stream media from upstream.")
+            yield first_chunk
+            while True:
+                chunk = await process.stdout.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+            await process.wait()
+            if process.returncode:
+                error = (await process.stderr.read()).decode(errors="replace").strip()
+                logger.error(f"ffmpeg stream ended with exit {process.returncode}: {error}")
+        finally:
+            if process is not None and process.returncode is None:
+                process.kill()
+                await process.wait()
+            self._slots.release()
+
+    @staticmethod
+    async def _resume(first_chunk: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        try:
+            yield first_chunk
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+
+ffmpeg_streamer = FFmpegStreamer()
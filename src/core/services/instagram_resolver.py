@@ -0,0 +1,139 @@
+import json
+import secrets
+import time
+from typing import Optional
+
+import httpx
+import orjson
+from src.commonLib.utils.logger_config import logger
+from src.core.settings.configurations.config import settings
+
+GRAPHQL_URL = "https://www.instagram.com/graphql/query"
+# The web app's shortcode query (xdt_api__v1__media__shortcode__web_info), as used by Instaloader.
+WEB_INFO_DOC_ID = "27128499623469141"
+WEB_APP_ID = "936619743392459"
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
+)
+
+
+class ResolveError(Exception):
+    """The lean resolver could not produce a post; the caller should fall back to Instaloader."""
+
+
+def node_from_media_item(item: dict) -> dict:
+    """
+    Convert a web-info media item to the GraphQL-style node `media_from_node` reads.
+
+    Only the media fields are carried over (first image candidate and video
+    version are the largest), unlike Instaloader's full normalization.
+    """
+    try:
+        media_type = item["media_type"]
+    except (KeyError, TypeError):
+        raise ResolveError("media item without media_type")
+
+    def media_node(media: dict) -> dict:
+        candidates = (media.get("image_versions2") or {}).get("candidates") or []
+        videos = media.get("video_versions") or []
+        return {
+            "is_video": media.get("media_type") == 2,
+            "display_url": candidates[0]["url"] if candidates else None,
+            "video_url": videos[0]["url"] if videos else None,
+        }
+
+    node = {"shortcode": item.get("code"), **media_node(item)}
+    if media_type == 8:
+        children = item.get("carousel_media") or []
+        if not children:
+            raise ResolveError("carousel without items")
+        node["edge_sidecar_to_children"] = {"edges": [{"node": media_node(child)} for child in children]}
+    elif not (node["video_url"] if node["is_video"] else node["display_url"]):
+        raise ResolveError("media item without a URL")
+    return node
+
+
+def parse_web_info(payload: bytes) -> dict:
+    """Parse a raw shortcode web-info response into a GraphQL-style post node."""
+    try:
+        data = orjson.loads(payload)
+        items = data["data"]["xdt_api__v1__media__shortcode__web_info"]["items"]
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        raise ResolveError("unexpected web-info response")
+    if not items:
+        raise ResolveError("no media in web-info response")
+    return node_from_media_item(items[0])
+
+
+class InstagramResolver:
+    """
+    Resolves a shortcode's media with a single anonymous GraphQL request.
+
+    This skips Instaloader's session setup, object graph and full metadata
+    normalization, and is enough for downloads. Any failure raises
+    ResolveError so the caller can fall back to Instaloader, which also covers
+    private posts. After Instagram throttles the resolver it is skipped for
+    `cooldown_seconds`.
+    """
+
+    def __init__(
+        self,
+        timeout: float = settings.INSTAGRAM_REQUEST_TIMEOUT_SECONDS,
+        proxy: str = settings.INSTAGRAM_PROXY,
+        cooldown_seconds: int = settings.INSTAGRAM_COOLDOWN_SECONDS,
+    ):
+        self.timeout = timeout
+        self.proxy = proxy
+        self.cooldown_seconds = cooldown_seconds
+        self._cooldown_until = 0.0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                proxy=self.proxy or None,
+                headers={"User-Agent": USER_AGENT, "X-IG-App-ID": WEB_APP_ID, "Accept": "*/*"},
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch_node(self, shortcode: str) -> dict:
+        """Fetch a post's GraphQL-style node, raising ResolveError on any failure."""
+        if time.monotonic() < self._cooldown_until:
+            raise ResolveError("cooling down after being rate limited")
+        # Anonymous requests only need the CSRF cookie and header to match.
+        csrf_token = secrets.token_hex(16)
+        variables = {
+            "shortcode": shortcode,
+            "__relay_internal__pv__PolarisAIGMMediaWebLabelEnabledrelayprovider": False,
+        }
+        try:
+            response = await self._get_client().post(
+                GRAPHQL_URL,
+                data={
+                    "variables": json.dumps(variables, separators=(",", ":")),
+                    "doc_id": WEB_INFO_DOC_ID,
+                    "server_timestamps": "true",
+                },
+                headers={
+                    "X-CSRFToken": csrf_token,
+                    "Cookie": f"csrftoken={csrf_token}",
+                    "Referer": f"https://www.instagram.com/p/{shortcode}/",
+                },
+            )
+        except httpx.HTTPError as e:
+            raise ResolveError(f"request failed: {e!r}")
+        if response.status_code == 429:
+            self._cooldown_until = time.monotonic() + self.cooldown_seconds
+            logger.warning("Lean Instagram resolver is rate limited, cooling down")
+        if response.status_code != 200:
+            raise ResolveError(f"status {response.status_code}")
+        return parse_web_info(response.content)
+
+
+instagram_resolver = InstagramResolver()
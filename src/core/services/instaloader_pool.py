@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import unquote
+
+from fastapi import HTTPException, status
+from src.commonLib.utils.logger_config import logger
+from src.core.settings.configurations.config import settings
+
+if TYPE_CHECKING:
+    import instaloader
+
+T = TypeVar("T")
+S = TypeVar("S")
+
+# How Instagram's throttling shows up in error messages; it is not always a 429.
+THROTTLE_MESSAGES = ("Please wait a few minutes", "Too Many Requests")
+
+
+class ContextThrottled(Exception):
+    """Raised instead of sleeping when an Instaloader context hits its rate limit."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def fail_fast_rate_controller(max_wait: float) -> Callable:
+    """
+    Build a RateController factory that raises ContextThrottled instead of sleeping.
+
+    Instaloader's controller sleeps the calling thread for up to many minutes
+    when a context runs into its rate limit. In a request handler it is better
+    to give up on that context and lease another one.
+    """
+    from instaloader import RateController
+
+    class FailFastRateController(RateController):
+        def wait_before_query(self, query_type: str) -> None:
+            waittime = self.query_waittime(query_type, time.monotonic(), False)
+            if waittime > max_wait:
+                raise ContextThrottled(waittime)
+            super().wait_before_query(query_type)
+
+        def handle_429(self, query_type: str) -> None:
+            raise ContextThrottled(self.query_waittime(query_type, time.monotonic(), True))
+
+    return FailFastRateController
+
+
+def is_throttled(error: BaseException) -> bool:
+    """Whether `error` (or what caused it) means Instagram is throttling the context."""
+    from instaloader.exceptions import TooManyRequestsException
+
+    while error is not None:
+        if isinstance(error, (ContextThrottled, TooManyRequestsException)):
+            return True
+        if any(message in str(error) for message in THROTTLE_MESSAGES):
+            return True
+        error = error.__cause__
+    return False
+
+
+class PooledContext:
+    """One long-lived Instaloader with its HTTP session and lease bookkeeping."""
+
+    def __init__(self, name: str, loader: instaloader.Instaloader):
+        self.name = name
+        self.loader = loader
+        self.leased = False
+        self.last_used = 0.0
+        self.cooldown_until = 0.0
+        self.uses = 0
+        self.throttled = 0
+
+
+class InstaloaderPool:
+    """
+    Pool of long-lived Instaloader contexts shared by all Instagram lookups.
+
+    Each context keeps its own requests session, so keep-alive connections and
+    cookies survive between requests. Contexts are loaded from session files
+    and INSTAGRAM_SESSION_ID; anonymous contexts are only used when no session
+    is configured. A request leases the least recently used free context, which
+    spreads queries evenly over the accounts. A context that Instagram
+    throttles is cooled down and the call is retried on another one; when every
+    context is cooling down the request fails fast with a 503 and Retry-After.
+
+    Contexts are created on first use, so importing instaloader is deferred.
+
+    Instaloader does blocking network I/O, so async code goes through `call`.
+    It runs the work on the pool's own threads, `max_concurrency` at a time,
+    which keeps slow Instagram responses from tying up the default threadpool
+    that other routes share. At most `max_queued` calls wait for a thread;
+    beyond that requests get a 503 right away.
+    """
+
+    def __init__(
+        self,
+        session_files: str = settings.INSTAGRAM_SESSION_FILES,
+        session_id: str = settings.INSTAGRAM_SESSION_ID,
+        proxy: str = settings.INSTAGRAM_PROXY,
+        anonymous_contexts: int = settings.INSTAGRAM_ANONYMOUS_CONTEXTS,
+        cooldown_seconds: int = settings.INSTAGRAM_COOLDOWN_SECONDS,
+        max_query_wait: float = settings.INSTAGRAM_MAX_QUERY_WAIT_SECONDS,
+        lease_timeout: float = settings.INSTAGRAM_LEASE_TIMEOUT_SECONDS,
+        request_timeout: float = settings.INSTAGRAM_REQUEST_TIMEOUT_SECONDS,
+        max_concurrency: int = settings.INSTAGRAM_MAX_CONCURRENCY,
+        max_queued: int = settings.INSTAGRAM_MAX_QUEUED_CALLS,
+    ):
+        self.session_files = [path.strip() for path in session_files.split(",") if path.strip()]
+        self.session_id = session_id
+        self.proxy = proxy
+        self.anonymous_contexts = anonymous_contexts
+        self.cooldown_seconds = cooldown_seconds
+        self.max_query_wait = max_query_wait
+        self.lease_timeout = lease_timeout
+        self.request_timeout = request_timeout
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self._contexts: Optional[List[PooledContext]] = None
+        self._condition = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._queued = 0
+        self._running = 0
+        self._calls = 0
+        self._queue_seconds = 0.0
+        self._max_queue_seconds = 0.0
+
+    def _create_loader(self) -> instaloader.Instaloader:
+        import instaloader
+
+        return instaloader.Instaloader(
+            sleep=False,
+            quiet=True,
+            max_connection_attempts=2,
+            request_timeout=self.request_timeout,
+            rate_controller=fail_fast_rate_controller(self.max_query_wait),
+        )
+
+    def _load_contexts(self) -> List[PooledContext]:
+        contexts = []
+        for path in self.session_files:
+            username = os.path.basename(path).removeprefix("session-")
+            loader = self._create_loader()
+            try:
+                loader.load_session_from_file(username, path)
+            except Exception as e:
+                logger.error(f"Could not load Instagram session {path}: {e}")
+                continue
+            contexts.append(PooledContext(username, loader))
+        if self.session_id:
+            # The sessionid cookie starts with the account's numeric id.
+            user_id = unquote(self.session_id).split(":")[0]
+            loader = self._create_loader()
+            loader.load_session(user_id, {
+                "sessionid": self.session_id,
+                "ds_user_id": user_id,
+                "csrftoken": secrets.token_hex(16),
+            })
+            contexts.append(PooledContext(f"session-id:{user_id}", loader))
+        if not contexts:
+            logger.warning("No Instagram session configured, using anonymous contexts")
+            contexts = [
+                PooledContext(f"anonymous-{index}", self._create_loader())
+                for index in range(max(1, self.anonymous_contexts))
+            ]
+        if self.proxy:
+            for context in contexts:
+                context.loader.context._session.proxies = {"http": self.proxy, "https": self.proxy}
+        logger.info(f"Instaloader pool ready with {len(contexts)} contexts")
+        return contexts
+
+    def _acquire(self, preferred: Optional[PooledContext] = None) -> PooledContext:
+        """Lease the least recently used free context, or wait for `preferred` when given."""
+        deadline = time.monotonic() + self.lease_timeout
+        with self._condition:
+            if self._contexts is None:
+                self._contexts = self._load_contexts()
+            candidates = [preferred] if preferred else self._contexts
+            while True:
+                now = time.monotonic()
+                free = [c for c in candidates if not c.leased and c.cooldown_until <= now]
+                if free:
+                    context = min(free, key=lambda c: c.last_used)
+                    context.leased = True
+                    return context
+                if not any(c.leased for c in candidates):
+                    retry_after = min(c.cooldown_until for c in candidates) - now
+                    raise HTTPException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail="Instagram is rate limiting us, please retry later.",
+                        headers={"Retry-After": str(math.ceil(retry_after))},
+                    )
+                if now >= deadline:
+                    raise HTTPException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail="All Instagram sessions are busy, please retry later.",
+                        headers={"Retry-After": "5"},
+                    )
+                # Wake up on a release, or when a context's cooldown runs out.
+                wake_at = min([deadline] + [c.cooldown_until for c in candidates if not c.leased])
+                self._condition.wait(timeout=wake_at - now)
+
+    def _release(self, context: PooledContext) -> None:
+        with self._condition:
+            context.leased = False
+            context.last_used = time.monotonic()
+            context.uses += 1
+            self._condition.notify()
+
+    def _cool_down(self, context: PooledContext, error: BaseException) -> None:
+        retry_after = getattr(error, "retry_after", 0)
+        with self._condition:
+            context.cooldown_until = time.monotonic() + max(self.cooldown_seconds, retry_after)
+            context.throttled += 1
+        logger.warning(f"Instaloader context {context.name} is rate limited, cooling down: {error}")
+
+    @contextmanager
+    def _lease_context(self, preferred: Optional[PooledContext] = None) -> Iterator[PooledContext]:
+        context = self._acquire(preferred)
+        try:
+            yield context
+        except Exception as e:
+            if is_throttled(e):
+                self._cool_down(context, e)
+            raise
+        finally:
+            self._release(context)
+
+    @contextmanager
+    def lease(self) -> Iterator[instaloader.Instaloader]:
+        """Lease a context for the duration of the block; throttled contexts are cooled down."""
+        with self._lease_context() as context:
+            yield context.loader
+
+    def run(self, func: Callable[[instaloader.Instaloader], T]) -> T:
+        """Call `func` with a leased loader, moving on to another context when one is throttled."""
+        while True:
+            try:
+                with self.lease() as loader:
+                    return func(loader)
+            except Exception as e:
+                if not is_throttled(e):
+                    raise
+            # The throttled context is cooling down now; the next lease picks another
+            # one or fails with a 503 once every context is cooling down.
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[ThreadPoolExecutor]:
+        """Wait for one of the `max_concurrency` slots and yield the executor to run on."""
+        if self._queued >= self.max_queued:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many Instagram requests in progress, please retry later.",
+                headers={"Retry-After": "5"},
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="instaloader"
+            )
+        queued_at = time.monotonic()
+        self._queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+        try:
+            waited = time.monotonic() - queued_at
+            self._calls += 1
+            self._queue_seconds += waited
+            self._max_queue_seconds = max(self._max_queue_seconds, waited)
+            self._running += 1
+            yield self._executor
+        finally:
+            self._running -= 1
+            self._slots.release()
+
+    async def call(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a blocking Instaloader call on the pool's threads and await the result."""
+        async with self._slot() as executor:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, partial(func, *args))
+
+    async def paginate(
+        self, fetch_page: Callable[[instaloader.Instaloader, Optional[S]], Tuple[List[T], Optional[S]]]
+    ) -> AsyncIterator[T]:
+        """
+        Yield the items of successive pages, holding a slot and a lease only while a page is fetched.
+
+        `fetch_page(loader, state)` runs on the pool's threads and returns the
+        page's items and the state for the next page, or None after the last
+        one; the first call gets None. The slot and the lease are released
+        while the page is consumed and taken again for the next page. Every
+        page uses the first page's context, since Instaloader's objects are
+        bound to it; if that context gets throttled, the next page fails with
+        a 503 instead of moving to another context.
+        """
+        context: Optional[PooledContext] = None
+
+        def fetch(state: Optional[S]) -> Tuple[List[T], Optional[S]]:
+            nonlocal context
+            with self._lease_context(context) as leased:
+                context = leased
+                return fetch_page(leased.loader, state)
+
+        items, state = await self.call(fetch, None)
+        while True:
+            for item in items:
+                yield item
+            if state is None:
+                return
+            items, state = await self.call(fetch, state)
+
+    def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._condition:
+            contexts = [
+                {
+                    "name": c.name,
+                    "leased": c.leased,
+                    "uses": c.uses,
+                    "throttled": c.throttled,
+                    "cooldown_seconds": max(0, round(c.cooldown_until - now)),
+                }
+                for c in self._contexts or []
+            ]
+        return {
+            "running": self._running,
+            "queued": self._queued,
+            "calls": self._calls,
+            "avg_queue_ms": round(1000 * self._queue_seconds / self._calls, 1) if self._calls else 0.0,
+            "max_queue_ms": round(1000 * self._max_queue_seconds, 1),
+            "contexts": contexts,
+        }
+
+
+instaloader_pool = InstaloaderPool()
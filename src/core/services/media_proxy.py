@@ -0,0 +1,139 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from fastapi import HTTPException
+from src.commonLib.utils.logger_config import logger
+from src.core.settings.configurations.config import settings
+
+
+class MediaProxy:
+    """
+    Relays upstream media to clients without blocking the event loop.
+
+    Each CDN host gets its own httpx client, so one slow or busy host cannot
+    take every pooled connection. Per host, at most `max_connections` are open
+    and `max_keepalive` idle ones are kept for reuse. Bytes are read from the
+    upstream socket only as fast as the client accepts them, and at most
+    `window_bytes` are held per transfer. Content is requested without
+    transfer compression so the upstream Content-Length can be relayed as-is.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = settings.MEDIA_PROXY_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive: int = settings.MEDIA_PROXY_KEEPALIVE_PER_HOST,
+        connect_timeout: float = settings.MEDIA_PROXY_CONNECT_TIMEOUT_SECONDS,
+        read_timeout: float = settings.MEDIA_PROXY_READ_TIMEOUT_SECONDS,
+        window_bytes: int = settings.MEDIA_PROXY_WINDOW_BYTES,
+    ):
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        # Waiting for a free pooled connection is bounded like a slow read.
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout, pool=read_timeout)
+        self.window_bytes = window_bytes
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _get_client(self, url: str) -> httpx.AsyncClient:
+        host = urlsplit(url).netloc.lower()
+        client = self._clients.get(host)
+        if client is None:
+            client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, follow_redirects=True)
+            self._clients[host] = client
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+    async def open(self, url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """
+        Send the request and return once the upstream headers have arrived.
+
+        The body is not read yet; hand the response to `stream`, or `aclose` it.
+        """
+        client = self._get_client(url)
+        request = client.build_request("GET", url, headers={**(headers or {}), "Accept-Encoding": "identity"})
+        try:
+            return await client.send(request, stream=True)
+        except httpx.TimeoutException as e:
+            logger.warning(f"Upstream media request timed out for {url}: {e!r}")
+            raise HTTPException(status_code=504, detail="Timed out fetching media from upstream")
+        except httpx.HTTPError as e:
+            logger.warning(f"Upstream media request failed for {url}: {e!r}")
+            raise HTTPException(status_code=502, detail="Failed to fetch media from upstream")
+
+    async def stream(self, response: httpx.Response) -> AsyncIterator[bytes]:
+        """Yield the body in chunks of up to `window_bytes`, closing the response when done."""
+        try:
+            async for chunk in response.aiter_raw(self.window_bytes):
+                yield chunk
+        except httpx.HTTPError as e:
+            # Headers are already sent; all that is left is to cut the transfer short.
+            logger.warning(f"Upstream media transfer failed for {response.url}: {e!r}")
+        finally:
+            await response.aclose()
+
+    async def _pump(self, url: str, queue: asyncio.Queue) -> None:
+        """Put the response, then its body chunks, then None (or the error) on `queue`."""
+        try:
+            response = await self.open(url)
+            try:
+                if response.status_code != 200:
+                    logger.warning(f"Upstream returned {response.status_code} for {url}")
+                    raise HTTPException(status_code=502, detail="Failed to fetch media from upstream")
+                await queue.put(response)
+                async for chunk in response.aiter_raw(self.window_bytes):
+                    await queue.put(chunk)
+            finally:
+                await response.aclose()
+            await queue.put(None)
+        except Exception as e:
+            await queue.put(e)
+
+    @staticmethod
+    async def _drain(queue: asyncio.Queue) -> AsyncIterator[bytes]:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def fetch_in_order(
+        self, urls: List[str], prefetch: int, buffer_bytes: int
+    ) -> AsyncIterator[Tuple[Optional[int], AsyncIterator[bytes]]]:
+        """
+        Fetch `urls` with up to `prefetch` transfers running, yielding each body in order.
+
+        Yields (Content-Length or None, chunks) per URL; each body must be
+        consumed before the next is yielded. While one body is consumed the
+        following ones download ahead, each buffering at most `buffer_bytes`.
+        Unlike `stream`, a failed transfer raises, so a truncated body is never
+        mistaken for a complete one.
+        """
+        pending = deque(urls)
+        in_flight: deque = deque()
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < prefetch:
+                    queue = asyncio.Queue(max(1, buffer_bytes // self.window_bytes))
+                    in_flight.append((queue, asyncio.create_task(self._pump(pending.popleft(), queue))))
+                queue, task = in_flight.popleft()
+                try:
+                    response = await queue.get()
+                    if isinstance(response, Exception):
+                        raise response
+                    length = response.headers.get("Content-Length")
+                    yield (int(length) if length else None), self._drain(queue)
+                finally:
+                    task.cancel()
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+
+
+media_proxy = MediaProxy()
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+from typing import AsyncIterator, Callable, Optional, Set
+
+from src.core.settings.configurations.config import settings
+from src.schemas.youtube_schema import DownloadProgress
+
+# Phases after which a job publishes nothing more.
+TERMINAL_PHASES = ("finished", "failed")
+
+
+class ProgressChannel:
+    """
+    Latest progress of one download job, fanned out to any number of subscribers.
+
+    Only the newest event matters to a progress bar, so each subscriber holds
+    at most one pending event and a slow subscriber skips intermediate ones
+    instead of buffering them. Must only be used from the event loop.
+    """
+
+    def __init__(self):
+        self.latest: Optional[DownloadProgress] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def publish(self, event: DownloadProgress) -> None:
+        self.latest = event
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def subscribe(self, heartbeat: float) -> AsyncIterator[Optional[DownloadProgress]]:
+        """
+        Yield the latest event and every later one until the job ends.
+
+        Yields None when nothing was published for `heartbeat` seconds, so the
+        caller can keep the connection alive.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        if self.latest:
+            queue.put_nowait(self.latest)
+        self._subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event.phase in TERMINAL_PHASES:
+                    return
+        finally:
+            self._subscribers.discard(queue)
+
+
+class ProgressReporter:
+    """
+    Thread-safe, throttled publisher used from yt-dlp hooks in download threads.
+
+    Updates within the same phase are sent at most once per `interval`;
+    phase changes and forced updates always go through. Events are handed to
+    the event loop with `call_soon_threadsafe`, so hooks never block on it.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[DownloadProgress], None],
+        loop: asyncio.AbstractEventLoop,
+        interval: float = settings.DOWNLOAD_PROGRESS_INTERVAL_SECONDS,
+    ):
+        self._publish = publish
+        self._loop = loop
+        self.interval = interval
+        self._phase: Optional[str] = None
+        self._sent_at = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, phase: str, force: bool = False, **fields) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if not force and phase == self._phase and now - self._sent_at < self.interval:
+                return
+            self._phase = phase
+            self._sent_at = now
+        try:
+            self._loop.call_soon_threadsafe(self._publish, DownloadProgress(phase=phase, **fields))
+        except RuntimeError:
+            pass  # The event loop is closed: the app is shutting down
@@ -0,0 +1,102 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+from src.commonLib.utils.logger_config import logger
+from src.core.settings.configurations.config import settings
+
+
+class SegmentError(Exception):
+    """An upstream range request returned something other than the requested bytes."""
+
+
+def split_ranges(size: int, segment_size: int) -> List[Tuple[int, int]]:
+    """Split `size` bytes into (start, end) ranges of `segment_size`, ends inclusive."""
+    return [
+        (start, min(start + segment_size, size) - 1)
+        for start in range(0, size, segment_size)
+    ]
+
+
+class SegmentedFetcher:
+    """
+    Downloads upstream media over several connections at once.
+
+    CDNs throttle each connection, so a large file is fetched as fixed-size
+    byte ranges with up to `connections` requests in flight. Segments are
+    yielded strictly in order, which keeps memory bounded to roughly
+    `connections * segment_size` per download. A failed segment is retried
+    from the last byte it received.
+    """
+
+    def __init__(
+        self,
+        connections: int = settings.SEGMENTED_FETCH_CONNECTIONS,
+        segment_size: int = settings.SEGMENTED_FETCH_SEGMENT_BYTES,
+        retries: int = settings.SEGMENTED_FETCH_RETRIES,
+        timeout: float = settings.SEGMENTED_FETCH_TIMEOUT_SECONDS,
+    ):
+        self.connections = connections
+        self.segment_size = segment_size
+        self.retries = retries
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_keepalive_connections=self.connections * 4),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch_range(
+        self, url: str, start: int, end: int, headers: Optional[Dict[str, str]] = None
+    ) -> bytes:
+        """Fetch bytes `start`-`end` (inclusive), resuming on failure up to `retries` times."""
+        buffer = bytearray()
+        expected = end - start + 1
+        for attempt in range(self.retries + 1):
+            request_headers = {**(headers or {}), "Range": f"bytes={start + len(buffer)}-{end}"}
+            try:
+                async with self._get_client().stream("GET", url, headers=request_headers) as response:
+                    if response.status_code != 206:
+                        raise SegmentError(f"expected 206, got {response.status_code}")
+                    async for chunk in response.aiter_bytes():
+                        buffer += chunk
+                if len(buffer) != expected:
+                    raise SegmentError(f"got {len(buffer)} of {expected} bytes")
+                return bytes(buffer)
+            except (httpx.HTTPError, SegmentError) as e:
+                if len(buffer) > expected:
+                    buffer.clear()
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"Segment {start}-{end} failed ({e}), retrying")
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def stream(
+        self, url: str, size: int, headers: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[bytes]:
+        """Yield the whole resource in order, fetching up to `connections` segments in parallel."""
+        ranges = deque(split_ranges(size, self.segment_size))
+        in_flight: deque = deque()
+        try:
+            while ranges or in_flight:
+                while ranges and len(in_flight) < self.connections:
+                    start, end = ranges.popleft()
+                    in_flight.append(asyncio.create_task(self.fetch_range(url, start, end, headers)))
+                yield await in_flight.popleft()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+
+segmented_fetcher = SegmentedFetcher()
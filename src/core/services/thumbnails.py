@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import io
+import os
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from src.commonLib.utils.logger_config import logger
+from src.core.services.download_store import DownloadStore, StoredFile
+from src.core.settings.configurations.config import settings
+
+# Output formats: Pillow encoder, media type and encoder options.
+THUMBNAIL_FORMATS = {
+    "avif": ("AVIF", "image/avif", {"quality": 55, "speed": 8}),
+    "webp": ("WEBP", "image/webp", {"quality": 75, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 80, "optimize": True, "progressive": True}),
+}
+
+_avif_supported: Optional[bool] = None
+
+
+def avif_supported() -> bool:
+    """Whether Pillow can encode AVIF; older builds ship without the encoder. Checked once, on first use."""
+    global _avif_supported
+    if _avif_supported is None:
+        from PIL import features
+
+        _avif_supported = bool(features.check("avif"))
+    return _avif_supported
+
+
+def parse_list(value: str) -> Tuple[str, ...]:
+    return tuple(part.strip() for part in value.split(",") if part.strip())
+
+
+def render_thumbnail(data: bytes, width: int, image_format: str) -> bytes:
+    """Scale an image down to `width` pixels wide (never up) and encode it as `image_format`."""
+    # Pillow is only loaded once a thumbnail is actually rendered.
+    from PIL import Image, ImageOps
+
+    encoder, _, options = THUMBNAIL_FORMATS[image_format]
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            # JPEGs are decoded at a reduced scale when they are much larger than needed.
+            source.draft("RGB", (width, 1))
+            image = ImageOps.exif_transpose(source)
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.Resampling.LANCZOS)
+            has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+            mode = "RGBA" if has_alpha and encoder != "JPEG" else "RGB"
+            if image.mode != mode:
+                image = image.convert(mode)
+            output = io.BytesIO()
+            image.save(output, encoder, **options)
+            return output.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning(f"Could not render thumbnail: {e}")
+        raise HTTPException(status_code=502, detail="Thumbnail source is not a usable image.")
+
+
+class ThumbnailService:
+    """
+    Serves resized, re-encoded copies of upstream thumbnails from a disk cache.
+
+    Only https images on `allowed_hosts` (or their subdomains) are fetched, so
+    the proxy cannot be pointed at arbitrary URLs. Requested widths are rounded
+    up to one of `widths`, which bounds the number of variants per image.
+    Results are kept in a DownloadStore keyed by (source URL, width, format)
+    under its own byte budget, evicting the least recently served thumbnails.
+    Concurrent requests for the same thumbnail share one fetch and encode.
+    The store keeps a running total of its size, so a miss only walks the
+    cache directory when the budget is exceeded, and then frees down to the
+    store's low-water mark.
+    """
+
+    def __init__(
+        self,
+        root: str = settings.THUMBNAIL_CACHE_DIR,
+        max_bytes: int = settings.THUMBNAIL_CACHE_MAX_BYTES,
+        widths: str = settings.THUMBNAIL_WIDTHS,
+        allowed_hosts: str = settings.THUMBNAIL_ALLOWED_HOSTS,
+        max_source_bytes: int = settings.THUMBNAIL_MAX_SOURCE_BYTES,
+        max_concurrency: int = settings.THUMBNAIL_MAX_CONCURRENCY,
+        timeout: float = settings.SEGMENTED_FETCH_TIMEOUT_SECONDS,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.widths = sorted(int(width) for width in parse_list(widths))
+        self.allowed_hosts = parse_list(allowed_hosts)
+        self.max_source_bytes = max_source_bytes
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._store: Optional[DownloadStore] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_store(self) -> DownloadStore:
+        if self._store is None:
+            self._store = DownloadStore(root=self.root, max_bytes=self.max_bytes)
+        return self._store
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, follow_redirects=False)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def snap_width(self, width: int) -> int:
+        """Round `width` up to the nearest configured width."""
+        return next((w for w in self.widths if w >= width), self.widths[-1])
+
+    def check_source(self, url: str) -> None:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        allowed = any(host == h or host.endswith(f".{h}") for h in self.allowed_hosts)
+        if parts.scheme != "https" or not allowed:
+            raise HTTPException(status_code=400, detail="Thumbnail source is not an allowed image host.")
+
+    async def acquire(self, url: str, width: int, image_format: str) -> StoredFile:
+        """
+        Return the thumbnail, producing it on a cache miss.
+
+        The result is pinned against eviction; the caller must `release` it.
+        """
+        self.check_source(url)
+        store = self._get_store()
+        key = DownloadStore.make_key(url, f"{width}:{image_format}")
+        stored = store.acquire(key)
+        if stored:
+            return stored
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._produce(key, url, width, image_format))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        await asyncio.shield(future)
+        stored = store.acquire(key)
+        if not stored:
+            raise HTTPException(status_code=503, detail="Thumbnail cache is full, please retry.")
+        return stored
+
+    def release(self, key: str) -> None:
+        self._get_store().release(key)
+
+    async def _fetch(self, url: str) -> bytes:
+        try:
+            async with self._get_client().stream("GET", url) as response:
+                if response.status_code == 404:
+                    raise HTTPException(status_code=404, detail="Thumbnail source not found.")
+                if response.status_code != 200:
+                    raise HTTPException(status_code=502, detail="Failed to fetch thumbnail source.")
+                if int(response.headers.get("Content-Length") or 0) > self.max_source_bytes:
+                    raise HTTPException(status_code=502, detail="Thumbnail source is too large.")
+                data = bytearray()
+                async for chunk in response.aiter_bytes():
+                    data += chunk
+                    if len(data) > self.max_source_bytes:
+                        raise HTTPException(status_code=502, detail="Thumbnail source is too large.")
+                return bytes(data)
+        except httpx.HTTPError as e:
+            logger.warning(f"Thumbnail fetch failed for {url}: {e}")
+            raise HTTPException(status_code=502, detail="Failed to fetch thumbnail source.")
+
+    async def _produce(self, key: str, url: str, width: int, image_format: str) -> StoredFile:
+        data = await self._fetch(url)
+        async with self._slots:
+            encoded = await run_in_threadpool(render_thumbnail, data, width, image_format)
+        return await run_in_threadpool(self._publish, key, encoded, image_format)
+
+    def _publish(self, key: str, encoded: bytes, image_format: str) -> StoredFile:
+        store = self._get_store()
+        workspace = store.create_workspace()
+        try:
+            path = os.path.join(workspace, key)
+            with open(path, "wb") as f:
+                f.write(encoded)
+            return store.publish(
+                key,
+                path,
+                f"thumbnail.{image_format}",
+                THUMBNAIL_FORMATS[image_format][1],
+                report={"etag": hashlib.sha256(encoded).hexdigest()[:32]},
+            )
+        finally:
+            store.discard_workspace(workspace)
+
+
+thumbnail_service = ThumbnailService()
@@ -0,0 +1,61 @@
+import subprocess
+import threading
+from typing import List
+
+from fastapi import HTTPException
+from src.commonLib.utils.logger_config import logger
+from src.core.settings.configurations.config import settings
+
+
+class Transcoder:
+    """
+    Re-encodes media to H.264/AAC MP4 or to audio-only formats for clients that ask for it.
+
+    Transcoding is the most CPU-expensive thing the service does, so it has its
+    own concurrency cap independent of the number of download workers.
+    """
+
+    def __init__(self, max_concurrency: int = settings.TRANSCODE_MAX_CONCURRENCY):
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def to_h264(self, source_path: str, target_path: str) -> None:
+        """Blocking transcode of `source_path` into `target_path`."""
+        command = [
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin", "-y",
+            "-i", source_path,
+            "-c:v", "libx264", "-preset", settings.TRANSCODE_PRESET, "-crf", "23",
+            "-c:a", "aac", "-b:a", "160k",
+            "-movflags", "+faststart",
+            target_path,
+        ]
+        self._run(command, source_path, "Error transcoding video.")
+
+    def to_audio(self, source_path: str, target_path: str, codec_args: List[str], muxer: str) -> None:
+        """
+        Blocking extraction of the first audio stream of `source_path`.
+
+        A stream copy (`-c:a copy`) only rewrites the container, so it does not
+        take a transcode slot.
+        """
+        command = [
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin", "-y",
+            "-i", source_path,
+            "-map", "0:a:0", "-vn", *codec_args,
+            *(["-movflags", "+faststart"] if muxer == "mp4" else []),
+            "-f", muxer,
+            target_path,
+        ]
+        self._run(command, source_path, "Error converting audio.", throttled=codec_args[-1] != "copy")
+
+    def _run(self, command: List[str], source_path: str, error: str, throttled: bool = True) -> None:
+        if throttled:
+            with self._slots:
+                result = subprocess.run(command, capture_output=True, text=True)
+        else:
+            result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            logger.error(f"Transcode of {source_path} failed: {result.stderr.strip()}")
+            raise HTTPException(status_code=500, detail=error)
+
+
+transcoder = Transcoder()
@@ -0,0 +1,166 @@
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from fastapi import HTTPException
+from src.commonLib.utils.logger_config import logger
+from src.core.services.segmented_fetch import split_ranges
+
+# Protocols ffmpeg can read directly from the format URL.
+DIRECT_PROTOCOLS = ("https", "http")
+
+# Codecs that stream-copy into MP4 and play in browsers, in order of preference.
+MP4_VIDEO_CODECS = ("avc1", "av01")
+MP4_AUDIO_CODECS = ("mp4a",)
+
+# Audio-only outputs: container, the source codec that can be copied into it
+# as is, and the encoder used for any other source.
+AUDIO_OUTPUTS = {
+    "m4a": {"ext": "m4a", "media_type": "audio/mp4", "muxer": "mp4", "codec": "mp4a",
+            "encoder": ["-c:a", "aac", "-b:a", "160k"]},
+    "mp3": {"ext": "mp3", "media_type": "audio/mpeg", "muxer": "mp3", "codec": "mp3",
+            "encoder": ["-c:a", "libmp3lame", "-q:a", "2"]},
+    "opus": {"ext": "opus", "media_type": "audio/ogg", "muxer": "ogg", "codec": "opus",
+             "encoder": ["-c:a", "libopus", "-b:a", "128k"]},
+}
+
+# Hosts that accept a byte range as a `range=start-end` query parameter.
+RANGE_QUERY_HOSTS = ("googlevideo.com",)
+
+
+def parse_height(quality: str) -> int:
+    """Convert a quality string such as "720" or "720p" to a height."""
+    try:
+        return int(str(quality).lower().rstrip("p"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid quality: {quality}")
+
+
+def has_video(fmt: dict) -> bool:
+    return bool(fmt.get("height")) and fmt.get("vcodec") not in (None, "none")
+
+
+def has_audio(fmt: dict) -> bool:
+    return fmt.get("acodec") not in (None, "none")
+
+
+def is_direct(fmt: dict) -> bool:
+    return fmt.get("protocol") in DIRECT_PROTOCOLS and bool(fmt.get("url"))
+
+
+def codec_family(codec: Optional[str]) -> str:
+    """Reduce a codec string such as "avc1.64001F" to its family ("avc1")."""
+    return (codec or "none").split(".")[0].lower()
+
+
+def video_codec_rank(fmt: dict) -> int:
+    family = codec_family(fmt.get("vcodec"))
+    return MP4_VIDEO_CODECS.index(family) if family in MP4_VIDEO_CODECS else len(MP4_VIDEO_CODECS)
+
+
+def is_mp4_compatible(formats: List[dict], video_codecs: tuple = MP4_VIDEO_CODECS) -> bool:
+    """Whether every stream in `formats` uses one of `video_codecs` or AAC audio."""
+    for fmt in formats:
+        if has_video(fmt) and codec_family(fmt.get("vcodec")) not in video_codecs:
+            return False
+        if has_audio(fmt) and codec_family(fmt.get("acodec")) not in MP4_AUDIO_CODECS:
+            return False
+    return True
+
+
+def select_video_format(formats: List[dict], height: int) -> Optional[dict]:
+    """
+    Pick the video format whose height is closest to `height`.
+
+    Ties prefer the taller format, then MP4-compatible codecs (H.264 before
+    AV1) so the merge can be a plain remux, then the higher bitrate.
+    """
+    candidates = [fmt for fmt in formats if has_video(fmt) and is_direct(fmt)]
+    if not candidates:
+        return None
+    return min(
+        candidates,
+        key=lambda fmt: (
+            abs(fmt["height"] - height),
+            -fmt["height"],
+            video_codec_rank(fmt),
+            -(fmt.get("tbr") or 0),
+        ),
+    )
+
+
+def select_audio_format(formats: List[dict], codecs: tuple = MP4_AUDIO_CODECS) -> Optional[dict]:
+    """Pick the best audio-only format, preferring `codecs` (AAC by default)."""
+    candidates = [
+        fmt for fmt in formats if has_audio(fmt) and not has_video(fmt) and is_direct(fmt)
+    ]
+    if not candidates:
+        return None
+    return min(
+        candidates,
+        key=lambda fmt: (
+            codec_family(fmt.get("acodec")) not in codecs,
+            -(fmt.get("abr") or fmt.get("tbr") or 0),
+        ),
+    )
+
+
+def select_stream_formats(info: dict, quality: str) -> List[dict]:
+    """Return the formats to mux for `quality`: one progressive format or video + audio."""
+    formats = info.get("formats") or []
+    height = parse_height(quality)
+    video = select_video_format(formats, height)
+    if not video:
+        raise HTTPException(status_code=404, detail="No suitable video formats available.")
+    if video["height"] != height:
+        logger.warning(f"Requested quality {height}p not available. Using {video['height']}p instead.")
+    if has_audio(video):
+        return [video]
+    audio = select_audio_format(formats)
+    return [video, audio] if audio else [video]
+
+
+def audio_codec_args(fmt: dict, audio_format: str) -> List[str]:
+    """ffmpeg codec arguments to turn `fmt` into `audio_format`: a stream copy when the codec fits."""
+    output = AUDIO_OUTPUTS[audio_format]
+    if codec_family(fmt.get("acodec")) == output["codec"]:
+        return ["-c:a", "copy"]
+    return output["encoder"]
+
+
+def as_segmented(fmt: dict, segment_size: int) -> dict:
+    """
+    Describe a direct googlevideo format of known size as DASH fragments.
+
+    yt-dlp downloads a plain https format over one connection, while fragments
+    are fetched `concurrent_fragment_downloads` at a time with per-fragment
+    retries. googlevideo takes the byte range as a `range` query parameter
+    (yt-dlp's DASH downloader does not send Range headers). Other formats are
+    returned unchanged.
+    """
+    size = fmt.get("filesize")
+    if not size or not is_direct(fmt) or size <= segment_size:
+        return fmt
+    if not (urlsplit(fmt["url"]).hostname or "").endswith(RANGE_QUERY_HOSTS):
+        return fmt
+    separator = "&" if "?" in fmt["url"] else "?"
+    segmented = {
+        **fmt,
+        "protocol": "http_dash_segments",
+        "fragments": [
+            {"url": f"{fmt['url']}{separator}range={start}-{end}"}
+            for start, end in split_ranges(size, segment_size)
+        ],
+    }
+    segmented.pop("downloader_options", None)
+    return segmented
+
+
+def segment_formats(info: dict, format_ids: set, segment_size: int) -> dict:
+    """Copy of `info` with the formats in `format_ids` passed through `as_segmented`."""
+    return {
+        **info,
+        "formats": [
+            as_segmented(fmt, segment_size) if fmt.get("format_id") in format_ids else fmt
+            for fmt in info.get("formats") or []
+        ],
+    }
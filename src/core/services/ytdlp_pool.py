@@ -0,0 +1,128 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from src.commonLib.utils.logger_config import logger
+from src.core.services import ytdlp_worker
+from src.core.settings.configurations.config import settings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+COOKIES_PATH = os.path.join(ROOT_DIR, "youtube.com_.txt")
+
+YTDL_BASE_OPTS: Dict[str, Any] = {
+    "quiet": True,
+    "no_warnings": True,
+    "noplaylist": True,
+    "cookiefile": COOKIES_PATH,
+    "headers": {
+        "User-Agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Mobile Safari/537.36"
+    },
+}
+
+# Playlist and channel listing: entries are left unresolved and pages are fetched lazily.
+YTDL_FLAT_OPTS: Dict[str, Any] = {
+    **YTDL_BASE_OPTS,
+    "noplaylist": False,
+    "extract_flat": "in_playlist",
+    "lazy_playlist": True,
+}
+
+# Video details without formats: the player JS is not fetched, so no signatures are solved,
+# and the HLS/DASH manifests are skipped. Used with process=False.
+YTDL_DETAILS_OPTS: Dict[str, Any] = {
+    **YTDL_BASE_OPTS,
+    "extractor_args": {"youtube": {"player_skip": ["js"], "skip": ["hls", "dash"]}},
+}
+
+# Option profiles available to the workers; each worker keeps one YoutubeDL per profile.
+YTDL_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": YTDL_BASE_OPTS,
+    "flat": YTDL_FLAT_OPTS,
+    "details": YTDL_DETAILS_OPTS,
+}
+
+
+class YtDlpProcessPool:
+    """
+    Pre-started pool of processes that run yt-dlp metadata extraction.
+
+    Extraction is CPU heavy (page and player parsing) and holds the GIL, so it
+    runs in separate processes instead of threads. Workers are spawned rather
+    than forked because the parent already has running threads and clients.
+    """
+
+    def __init__(self, size: int = settings.YTDLP_POOL_SIZE):
+        self.size = size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._warm_up_task: Optional[asyncio.Task] = None
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=ytdlp_worker.init_worker,
+            initargs=(YTDL_PROFILES,),
+        )
+
+    async def start(self, wait: bool = True) -> None:
+        """
+        Spawn every worker up front so the first requests don't pay for it.
+
+        With `wait=False` the workers are spawned in the background and this
+        returns immediately; requests arriving before they are up queue on the
+        executor as usual.
+        """
+        self._executor = self._create_executor()
+        warm_up = self._warm_up(self._executor)
+        if wait:
+            await warm_up
+        else:
+            self._warm_up_task = asyncio.create_task(warm_up)
+
+    async def _warm_up(self, executor: ProcessPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            pids = await asyncio.gather(
+                *[
+                    loop.run_in_executor(executor, ytdlp_worker.warm_up)
+                    for _ in range(self.size)
+                ]
+            )
+        except Exception as e:
+            logger.error(f"yt-dlp worker pool failed to start: {e}")
+            return
+        logger.info(f"yt-dlp worker pool started with pids {sorted(set(pids))}")
+
+    def stop(self) -> None:
+        if self._warm_up_task:
+            self._warm_up_task.cancel()
+            self._warm_up_task = None
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("yt-dlp worker pool stopped")
+
+    async def extract_info(
+        self, url: str, profile: str = "default", process: bool = True
+    ) -> Optional[dict]:
+        """Run `extract_info` in a worker process, restarting the pool if it broke."""
+        if self._executor is None:
+            self._executor = self._create_executor()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, ytdlp_worker.extract_info, url, profile, process
+            )
+        except BrokenProcessPool:
+            logger.error("yt-dlp worker pool is broken, restarting it")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+            return await loop.run_in_executor(
+                self._executor, ytdlp_worker.extract_info, url, profile, process
+            )
+
+
+ytdlp_pool = YtDlpProcessPool()
@@ -0,0 +1,63 @@
+"""
+Code that runs inside the yt-dlp worker processes.
+
+This module is imported by freshly spawned interpreters, so it must stay free of
+application imports (settings, database clients, routers). yt_dlp is imported
+once per process in `init_worker`, and one `YoutubeDL` per option profile is
+kept alive so cookie jars, extractor instances and HTTP connections are reused
+across requests.
+"""
+import os
+from typing import Any, Dict, Optional
+
+# Keys that are large, expensive to pickle back to the parent and never used by the API.
+TRIMMED_KEYS = ("automatic_captions", "heatmap")
+
+_profiles: Dict[str, Dict[str, Any]] = {}
+_instances: Dict[str, Any] = {}
+
+
+class ExtractionError(Exception):
+    """Picklable stand-in for yt-dlp errors raised inside a worker."""
+
+
+def init_worker(profiles: Dict[str, Dict[str, Any]]) -> None:
+    """Process initializer: import yt_dlp and build the default instance."""
+    global _profiles
+    import yt_dlp  # noqa: F401  (imported once per worker process)
+
+    _profiles = profiles
+    _get_instance("default")
+
+
+def _get_instance(profile: str):
+    import yt_dlp
+
+    if profile not in _instances:
+        _instances[profile] = yt_dlp.YoutubeDL(_profiles[profile])
+    return _instances[profile]
+
+
+def warm_up() -> int:
+    """No-op task used to force every worker process to start."""
+    return os.getpid()
+
+
+def extract_info(url: str, profile: str = "default", process: bool = True) -> Optional[dict]:
+    """
+    Extract metadata for `url` and return a picklable, trimmed info dict.
+
+    With `process=False` the extractor's result is returned as-is: formats are
+    neither selected nor sorted, so they are dropped too.
+    """
+    ydl = _get_instance(profile)
+    try:
+        info = ydl.extract_info(url, download=False, process=process)
+    except Exception as e:
+        raise ExtractionError(str(e)) from None
+    if info is None:
+        return None
+    info = ydl.sanitize_info(info)
+    for key in TRIMMED_KEYS if process else TRIMMED_KEYS + ("formats", "requested_formats"):
+        info.pop(key, None)
+    return info
@@ -0,0 +1,50 @@
+import time
+import zipfile
+from typing import AsyncIterable, AsyncIterator, Optional, Tuple
+
+
+class _Sink:
+    """Write-only file object collecting what ZipFile writes until it is drained."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self.buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+async def stream_zip(
+    entries: AsyncIterable[Tuple[str, Optional[int], AsyncIterable[bytes]]],
+) -> AsyncIterator[bytes]:
+    """
+    Build a ZIP archive on the fly from (name, size or None, chunks) entries.
+
+    Entries are stored uncompressed, since media is already compressed. The
+    archive is written to a non-seekable sink, so ZipFile puts each entry's
+    CRC and sizes in a data descriptor after its data and nothing has to be
+    rewritten. Only the chunk being written is held in memory.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        async for name, size, chunks in entries:
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            if size is not None:
+                # Lets ZipFile switch to ZIP64 for entries over 4 GiB.
+                info.file_size = size
+            with archive.open(info, "w") as entry:
+                async for chunk in chunks:
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()
+    yield sink.drain()
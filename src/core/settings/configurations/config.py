@@ -44,7 +44,194 @@ class CustomSettings(BaseSettings):
     API_KEY_AUTH_ENABLED: bool = Field(
         True, description="Enable or disable API key authentication"
     )
-    INSTAGRAM_SESSION_ID:str
+    INSTAGRAM_SESSION_ID: str = Field(
+        "", description="sessionid cookie of an Instagram account used for lookups"
+    )
+
+    # Download Job Settings
+    DOWNLOAD_WORKERS: int = Field(
+        2, description="Number of YouTube downloads processed concurrently"
+    )
+    DOWNLOAD_QUEUE_SIZE: int = Field(
+        20, description="Maximum number of download jobs waiting for a worker"
+    )
+    DOWNLOAD_JOB_TTL_SECONDS: int = Field(
+        3600, description="How long finished download job records are kept"
+    )
+    DOWNLOAD_PROGRESS_INTERVAL_SECONDS: float = Field(
+        0.5, description="Minimum time between progress updates published for a download"
+    )
+    DOWNLOADS_DIR: str = Field(
+        "./downloads", description="Root directory of the download store"
+    )
+    DOWNLOAD_STORE_MAX_BYTES: int = Field(
+        10 * 1024**3, description="Disk budget for stored downloads in bytes"
+    )
+    DOWNLOAD_TMP_MAX_AGE_SECONDS: int = Field(
+        6 * 3600, description="Age after which abandoned partial downloads are removed"
+    )
+    DOWNLOAD_JANITOR_INTERVAL_SECONDS: int = Field(
+        600, description="Interval between download store cleanup runs"
+    )
+
+    YTDLP_POOL_SIZE: int = Field(
+        os.cpu_count() or 2,
+        description="Number of worker processes used for yt-dlp metadata extraction",
+    )
+
+    # Streaming Settings
+    STREAM_MAX_CONCURRENCY: int = Field(
+        8, description="Maximum number of concurrent ffmpeg streams per worker"
+    )
+    STREAM_CHUNK_SIZE: int = Field(
+        256 * 1024, description="Bytes read from ffmpeg per streamed chunk"
+    )
+
+    TRANSCODE_MAX_CONCURRENCY: int = Field(
+        1, description="Maximum number of concurrent explicit transcodes per worker"
+    )
+    TRANSCODE_PRESET: str = Field(
+        "veryfast", description="x264 preset used for explicit transcodes"
+    )
+
+    # Segmented Fetch Settings
+    SEGMENTED_FETCH_CONNECTIONS: int = Field(
+        4, description="Parallel range requests per upstream media download"
+    )
+    SEGMENTED_FETCH_SEGMENT_BYTES: int = Field(
+        2 * 1024 * 1024, description="Size of each range request"
+    )
+    SEGMENTED_FETCH_MIN_BYTES: int = Field(
+        4 * 1024 * 1024, description="Smaller media is fetched over a single connection"
+    )
+    SEGMENTED_FETCH_RETRIES: int = Field(
+        3, description="Retries per segment before the download fails"
+    )
+    SEGMENTED_FETCH_TIMEOUT_SECONDS: float = Field(
+        20, description="Connect and read timeout for upstream media requests"
+    )
+
+    # Media Proxy Settings
+    MEDIA_PROXY_MAX_CONNECTIONS_PER_HOST: int = Field(
+        64, description="Open connections per upstream CDN host"
+    )
+    MEDIA_PROXY_KEEPALIVE_PER_HOST: int = Field(
+        16, description="Idle connections kept alive per upstream CDN host"
+    )
+    MEDIA_PROXY_CONNECT_TIMEOUT_SECONDS: float = Field(
+        5, description="Timeout for connecting to an upstream CDN host"
+    )
+    MEDIA_PROXY_READ_TIMEOUT_SECONDS: float = Field(
+        30, description="Timeout between bytes received from upstream"
+    )
+    MEDIA_PROXY_WINDOW_BYTES: int = Field(
+        256 * 1024, description="Most bytes buffered per proxied transfer"
+    )
+
+    # Thumbnail Settings
+    THUMBNAIL_CACHE_DIR: str = Field(
+        "./cache/thumbnails", description="Directory of the resized thumbnail cache"
+    )
+    THUMBNAIL_CACHE_MAX_BYTES: int = Field(
+        512 * 1024**2, description="Disk budget for cached thumbnails in bytes"
+    )
+    THUMBNAIL_WIDTHS: str = Field(
+        "160,320,480,640,960,1280",
+        description="Comma-separated widths thumbnails are resized to; requests are rounded up",
+    )
+    THUMBNAIL_ALLOWED_HOSTS: str = Field(
+        "ytimg.com,ggpht.com,cdninstagram.com,fbcdn.net",
+        description="Comma-separated image hosts (and their subdomains) the thumbnail proxy fetches from",
+    )
+    THUMBNAIL_MAX_SOURCE_BYTES: int = Field(
+        10 * 1024**2, description="Largest upstream image the thumbnail proxy accepts"
+    )
+    THUMBNAIL_MAX_CONCURRENCY: int = Field(
+        2, description="Concurrent thumbnail resizes and encodes per worker"
+    )
+    THUMBNAIL_MAX_AGE_SECONDS: int = Field(
+        7 * 24 * 3600, description="Cache-Control max-age sent with thumbnails"
+    )
+
+    # Instagram Settings
+    INSTAGRAM_SESSION_FILES: str = Field(
+        "", description="Comma-separated session files saved by `instaloader --login` (session-<username>)"
+    )
+    INSTAGRAM_PROXY: str = Field(
+        "", description="Proxy URL for all Instagram requests, e.g. http://host:port"
+    )
+    INSTAGRAM_ANONYMOUS_CONTEXTS: int = Field(
+        1, description="Anonymous Instaloader contexts used when no session is configured"
+    )
+    INSTAGRAM_COOLDOWN_SECONDS: int = Field(
+        600, description="How long a rate-limited Instaloader context is left unused"
+    )
+    INSTAGRAM_MAX_QUERY_WAIT_SECONDS: float = Field(
+        5, description="A context that would have to pause longer than this for its own rate limit is cooled down instead"
+    )
+    INSTAGRAM_LEASE_TIMEOUT_SECONDS: float = Field(
+        30, description="How long a request waits for a free Instaloader context"
+    )
+    INSTAGRAM_REQUEST_TIMEOUT_SECONDS: float = Field(
+        15, description="Timeout of each request to Instagram"
+    )
+    INSTAGRAM_MAX_CONCURRENCY: int = Field(
+        4, description="Instaloader calls running at once per worker"
+    )
+    INSTAGRAM_MAX_QUEUED_CALLS: int = Field(
+        32, description="Instaloader calls allowed to wait for a thread before answering 503"
+    )
+    INSTAGRAM_LEAN_RESOLVER: bool = Field(
+        True, description="Resolve download media with one direct request before falling back to Instaloader"
+    )
+    INSTAGRAM_POST_CACHE_TTL_SECONDS: int = Field(
+        3600, description="Maximum lifetime of a cached Instagram post"
+    )
+    INSTAGRAM_NEGATIVE_CACHE_TTL_SECONDS: int = Field(
+        300, description="How long missing or private posts are remembered"
+    )
+    INSTAGRAM_FAILURE_CACHE_TTL_SECONDS: int = Field(
+        30, description="How long posts whose lookup failed are remembered"
+    )
+    INSTAGRAM_PROFILE_PAGE_SIZE: int = Field(
+        24, description="Default number of posts returned per profile feed page"
+    )
+    INSTAGRAM_ZIP_PREFETCH_ITEMS: int = Field(
+        3, description="Carousel items downloaded at once while building a ZIP"
+    )
+    INSTAGRAM_ZIP_ITEM_BUFFER_BYTES: int = Field(
+        4 * 1024 * 1024, description="Most bytes buffered per carousel item fetched ahead"
+    )
+
+    # Batch Settings
+    BATCH_YOUTUBE_CONCURRENCY: int = Field(
+        4, description="Concurrent YouTube extractions for batch metadata requests"
+    )
+    BATCH_INSTAGRAM_CONCURRENCY: int = Field(
+        2, description="Concurrent Instagram lookups for batch metadata requests"
+    )
+
+    # Playlist Settings
+    PLAYLIST_PAGE_SIZE: int = Field(
+        100, description="Default number of entries returned per playlist page"
+    )
+    PLAYLIST_FULL_METADATA_CONCURRENCY: int = Field(
+        4, description="Concurrent extractions when full metadata is requested per playlist entry"
+    )
+
+    # Cache Settings
+    CACHE_DIR: str = Field(
+        "./cache", description="Directory for caches shared by all workers on a host"
+    )
+    METADATA_CACHE_SIZE: int = Field(
+        256, description="Number of metadata entries kept in each worker's memory"
+    )
+    METADATA_CACHE_TTL_SECONDS: int = Field(
+        3600, description="Maximum lifetime of cached metadata"
+    )
+    CACHE_JANITOR_INTERVAL_SECONDS: int = Field(
+        3600, description="Interval between removals of expired cache files"
+    )
 
     # Email Configuration
 
@@ -34,12 +34,19 @@ def create_mongo_client():
         logger.error(f"Error connecting to MongoDB: {e}")
         raise
 
-# Initialize MongoDB Client
-client = create_mongo_client()
-db_client = client[MONGO_DB_NAME]
+_client = None
 
-# Collections Access
-template_collection = db_client["templates"]
+
+def get_mongo_client() -> AsyncIOMotorClient:
+    """Return the shared MongoDB client, creating it on first use (at startup)."""
+    global _client
+    if _client is None:
+        _client = create_mongo_client()
+    return _client
+
+
+def get_template_collection():
+    return get_mongo_client()[MONGO_DB_NAME]["templates"]
 
 
 
@@ -1,6 +1,8 @@
+import asyncio
 import time
 import uuid
 from fastapi import FastAPI, Request, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.exceptions import RequestValidationError
 from src.api.routers import analytics_routes
@@ -9,20 +11,27 @@ from starlette.middleware.cors import CORSMiddleware
 from slowapi import  _rate_limit_exceeded_handler
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.util import get_remote_address
-from src.commonLib.utils.logger_config import logger
+from src.commonLib.utils.logger_config import logger, logger_config
 from src.core.settings.configurations.config import settings
 from src.api.routers.routes import router as global_router
+from src.api.routers.instagram_routes import post_cache
+from src.api.routers.youtube_routes import check_ffmpeg, metadata_cache
 from src.database.base import Base
 from src.database.sessions.session import engine
 from src.limiter import limiter
-from src.database.sessions.mongo_client import client
+from src.database.sessions.mongo_client import get_mongo_client
+from src.core.services.download_jobs import download_job_manager
+from src.core.services.download_store import download_store
+from src.core.services.instagram_resolver import instagram_resolver
+from src.core.services.instaloader_pool import instaloader_pool
+from src.core.services.media_proxy import media_proxy
+from src.core.services.segmented_fetch import segmented_fetcher
+from src.core.services.thumbnails import thumbnail_service
+from src.core.services.ytdlp_pool import ytdlp_pool
 
 
 
 
-# Initialize database schema (For relational databases)
-Base.metadata.create_all(bind=engine)
-
 def create_application() -> FastAPI:
     """Initialize FastAPI app with configurations."""
     app = FastAPI(
@@ -108,23 +117,93 @@ def register_exception_handlers(app: FastAPI):
 
 def register_event_handlers(app: FastAPI):
     """Handles startup and shutdown events for database connections."""
-    @app.on_event("startup")
     async def startup_db_client():
         """ MongoDB Connection on Startup"""
         try:
-            app.mongodb_client = client
+            app.mongodb_client = get_mongo_client()
             app.mongodb = app.mongodb_client.get_database(settings.MONGO_DB_NAME)
             logger.info("  MongoDB connection established successfully")
         except Exception as e:
             logger.error(f"  Failed to connect to MongoDB: {str(e)}")
 
+    async def create_database_schema():
+        """Initialize database schema (For relational databases)"""
+        await run_in_threadpool(Base.metadata.create_all, bind=engine)
+
+    async def verify_ffmpeg():
+        if not await run_in_threadpool(check_ffmpeg):
+            raise RuntimeError("FFmpeg is required but not found. Please install it.")
+
+    async def start_download_workers():
+        """Start the YouTube download worker pool and the store and cache janitors"""
+        await download_job_manager.start()
+        download_store.start_janitor()
+        metadata_cache.start_janitor()
+        post_cache.start_janitor()
+
+    @app.on_event("startup")
+    async def startup():
+        """Run the independent startup steps concurrently so new workers are ready sooner"""
+        started = time.perf_counter()
+        # File sinks first, so the remaining steps are logged to the files too.
+        await run_in_threadpool(logger_config.add_file_sinks)
+        await asyncio.gather(
+            verify_ffmpeg(),
+            create_database_schema(),
+            startup_db_client(),
+            start_download_workers(),
+            # yt-dlp workers are spawned in the background; requests queue until they are up.
+            ytdlp_pool.start(wait=False),
+        )
+        logger.info(f"Startup completed in {time.perf_counter() - started:.3f}s")
+
     @app.on_event("shutdown")
     async def shutdown_db_client():
         """ MongoDB Connection on Shutdown"""
+        if not hasattr(app, "mongodb_client"):
+            return
         logger.info(" 📴 Shutting down MongoDB client...")
         app.mongodb_client.close()
         logger.info(" MongoDB client shutdown complete")
 
+    @app.on_event("shutdown")
+    async def stop_download_workers():
+        """Stop the YouTube download worker pool and the store and cache janitors"""
+        await download_job_manager.stop()
+        await download_store.stop_janitor()
+        await metadata_cache.stop_janitor()
+        await post_cache.stop_janitor()
+
+    @app.on_event("shutdown")
+    async def close_segmented_fetcher():
+        """Close the upstream media HTTP client"""
+        await segmented_fetcher.aclose()
+
+    @app.on_event("shutdown")
+    async def close_media_proxy():
+        """Close the pooled upstream media proxy clients"""
+        await media_proxy.aclose()
+
+    @app.on_event("shutdown")
+    async def close_thumbnail_service():
+        """Close the thumbnail proxy HTTP client"""
+        await thumbnail_service.aclose()
+
+    @app.on_event("shutdown")
+    async def close_instagram_resolver():
+        """Close the lean Instagram resolver HTTP client"""
+        await instagram_resolver.aclose()
+
+    @app.on_event("shutdown")
+    async def stop_instaloader_pool():
+        """Stop the Instaloader worker threads"""
+        instaloader_pool.shutdown()
+
+    @app.on_event("shutdown")
+    async def stop_ytdlp_pool():
+        """Stop the yt-dlp metadata worker processes"""
+        ytdlp_pool.stop()
+
     @app.middleware("http")
     async def performance_monitoring_middleware(request: Request, call_next):
         """Middleware to log API response times."""
@@ -1,14 +1,17 @@
 from datetime import datetime
+from functools import lru_cache
 from pydantic import BaseModel, Field, HttpUrl
 from pymongo import MongoClient
 from typing import Optional
 from src.commonLib.models.mongo_base_class import BaseModel
 
 from src.core.settings.configurations.config import settings
-# MongoDB setup
-client = MongoClient(settings.MONGO_DB_URL)  
-db = client.streamsaver_db
-visits_collection = db.visitor_logs
+# MongoDB setup, deferred to first use so importing the app does not start a client
+@lru_cache(maxsize=None)
+def get_visits_collection():
+    client = MongoClient(settings.MONGO_DB_URL)
+    db = client.streamsaver_db
+    return db.visitor_logs
 
 
 
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+class BatchMetadataRequest(BaseModel):
+    """Schema for requesting metadata for several URLs at once."""
+    urls: List[str] = Field(..., min_length=1, max_length=50)
+
+class BatchItemError(BaseModel):
+    """Represents why a single URL in a batch could not be resolved."""
+    status_code: int
+    detail: str
+
+class BatchMetadataItem(BaseModel):
+    """Represents one NDJSON line of a batch metadata response."""
+    index: int  # Position of the URL in the request
+    url: str
+    platform: Optional[str] = None  # "youtube" or "instagram"
+    data: Optional[Any] = None
+    error: Optional[BatchItemError] = None
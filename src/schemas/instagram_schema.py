@@ -1,5 +1,5 @@
-from pydantic import BaseModel, HttpUrl
-from typing import List, Optional
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
 
 class InstagramUser(BaseModel):
@@ -71,4 +71,29 @@ class InstagramPostResponse(BaseModel):
     owner_username: str
     owner_profile_pic: Optional[HttpUrl] = None
     music: Optional[str] = None  # Only for Reels
-    is_sponsored: bool = False
\ No newline at end of file
+    is_sponsored: bool = False
+
+class InstagramProfileInfo(BaseModel):
+    """First NDJSON line of a profile feed: the profile itself."""
+    type: Literal["profile"] = "profile"
+    id: Optional[str] = None
+    username: str
+    full_name: Optional[str] = None
+    profile_pic_url: Optional[str] = None
+    post_count: Optional[int] = None
+    is_private: bool = False
+
+class InstagramProfilePost(BaseModel):
+    """One post of a profile feed, with the same fields as /instagram/metadata."""
+    type: Literal["post"] = "post"
+    index: int  # Position in the feed, newest first, starting at 0
+    shortcode: str
+    metadata: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None  # Why the post could not be processed
+    resume_cursor: Optional[str] = Field(None, exclude=True)  # Cursor to continue after this post, never serialized
+
+class InstagramProfilePageEnd(BaseModel):
+    """Last NDJSON line of a profile feed page."""
+    type: Literal["end"] = "end"
+    count: int  # Posts returned in this page
+    next_cursor: Optional[str] = None  # Pass back as `cursor` for the next page; null when done
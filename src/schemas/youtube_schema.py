@@ -1,5 +1,6 @@
-from pydantic import BaseModel, HttpUrl
-from typing import List, Optional
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Dict, List, Literal, Optional
+from datetime import datetime
 
 class VideoThumbnail(BaseModel):
     """Represents a YouTube video thumbnail."""
@@ -35,3 +36,73 @@ class YoutubeDownloadForm(BaseModel):
     """Schema for requesting a YouTube video download."""
     url: HttpUrl
     quality: str  # Example: "1080p", "720p", etc.
+
+class DirectLink(BaseModel):
+    """A signed upstream URL the client can download from directly."""
+    format_id: str
+    url: str
+    expires_at: Optional[datetime] = None  # When the signed URL stops working
+    resolution: Optional[str] = None
+    ext: Optional[str] = None
+    filesize: Optional[int] = None
+    http_headers: Dict[str, str] = {}  # Headers the upstream expects on the request
+
+class ProcessingReport(BaseModel):
+    """Describes how a downloaded file was produced."""
+    mode: str  # "remux" (stream copy) or "transcode"
+    video_codec: Optional[str] = None
+    audio_codec: Optional[str] = None
+    seconds: float = 0  # Time spent merging or transcoding
+
+class DownloadProgress(BaseModel):
+    """A progress update for a download job."""
+    phase: str  # "queued", "running", "downloading", "merging", "transcoding", "finished", "failed"
+    downloaded_bytes: Optional[int] = None  # Across all streams of the download
+    total_bytes: Optional[int] = None  # Estimated until every stream size is known
+    speed: Optional[float] = None  # Bytes per second
+    eta: Optional[float] = None  # Seconds left for the current stream
+    format_id: Optional[str] = None  # Stream currently being downloaded
+    error: Optional[str] = None
+
+class DownloadJob(BaseModel):
+    """Represents a queued or completed YouTube download job."""
+    id: str
+    url: str
+    quality: str
+    status: str = "queued"  # "queued", "running", "finished", "failed"
+    filename: Optional[str] = None
+    processing: Optional[ProcessingReport] = None
+    progress: Optional[DownloadProgress] = None  # Latest progress update
+    store_key: Optional[str] = Field(None, exclude=True)  # Download store key, never serialized
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class PlaylistInfo(BaseModel):
+    """First NDJSON line of a playlist listing: the playlist or channel itself."""
+    type: Literal["playlist"] = "playlist"
+    id: Optional[str] = None
+    title: Optional[str] = None
+    uploader: Optional[str] = None
+    webpage_url: Optional[str] = None
+
+class PlaylistEntry(BaseModel):
+    """One video of a playlist listing, from flat extraction."""
+    type: Literal["entry"] = "entry"
+    index: int  # Position in the playlist, starting at 0
+    id: Optional[str] = None
+    title: Optional[str] = None
+    url: Optional[str] = None
+    duration: Optional[float] = None
+    channel: Optional[str] = None
+    view_count: Optional[int] = None
+    thumbnail: Optional[str] = None
+    metadata: Optional[YoutubeVideoMetadata] = None  # Only when full metadata was requested
+    error: Optional[str] = None  # Why full metadata could not be fetched
+
+class PlaylistPageEnd(BaseModel):
+    """Last NDJSON line of a playlist listing."""
+    type: Literal["end"] = "end"
+    count: int  # Entries returned in this page
+    next_cursor: Optional[str] = None  # Pass back as `cursor` for the next page; null when done
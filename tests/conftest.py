@@ -0,0 +1,25 @@
+import os
+import tempfile
+
+# Settings are read when `src` is first imported; give the required ones
+# placeholder values and keep caches and downloads out of the working tree.
+_test_dir = tempfile.mkdtemp(prefix="stream-saver-tests-")
+for name, value in {
+    "ALLOWED_HOSTS": "*",
+    "ALLOWED_ORIGINS": "*",
+    "ALLOWED_METHODS": "GET,POST",
+    "SECRET_KEY": "test",
+    "PROJECT_NAME": "stream-saver",
+    "API_URL_PREFIX": "/api/v1",
+    "POSTGRES_DB_URL": "sqlite:///:memory:",
+    "MONGO_DB_URL": "mongodb://localhost:27017",
+    "MONGO_DB_NAME": "test",
+    "JWT_TOKEN_PREFIX": "Bearer",
+    "JWT_ALGORITHM": "HS256",
+    "JWT_EXPIRE_MINUTES": "5",
+    "HEADER_KEY": "test",
+    "DOWNLOADS_DIR": os.path.join(_test_dir, "downloads"),
+    "CACHE_DIR": os.path.join(_test_dir, "cache"),
+    "THUMBNAIL_CACHE_DIR": os.path.join(_test_dir, "thumbnails"),
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,186 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from src.api.routers import instagram_routes
+from src.api.routers.instagram_routes import media_from_node
+from src.core.services.cache import TieredCache
+from src.core.services.instagram_resolver import InstagramResolver, ResolveError, parse_web_info
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "instagram")
+CDN = "https://scontent.cdninstagram.com"
+
+
+def load_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def make_resolver(responses):
+    """A resolver whose requests are answered from (status, fixture) pairs, in order."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        status_code, fixture = responses[len(requests) - 1]
+        return httpx.Response(status_code, content=load_fixture(fixture))
+
+    resolver = InstagramResolver(timeout=5, proxy="", cooldown_seconds=600)
+    resolver._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return resolver, requests
+
+
+def test_parse_web_info_image():
+    node = parse_web_info(load_fixture("web_info_image.json"))
+
+    assert node["shortcode"] == "DAbCdEfGhIj"
+    assert node["is_video"] is False
+    # The first candidate is the largest rendition.
+    assert node["display_url"].startswith(f"{CDN}/v/t51.29350-15/image_1440.jpg")
+    assert media_from_node(node) == [{"url": node["display_url"], "index": 0, "type": "image"}]
+
+
+def test_parse_web_info_video():
+    node = parse_web_info(load_fixture("web_info_video.json"))
+
+    assert node["is_video"] is True
+    assert node["video_url"].startswith(f"{CDN}/o1/v/t16/f2/m86/video_1080.mp4")
+    assert media_from_node(node) == [{"url": node["video_url"], "index": 0, "type": "video"}]
+
+
+def test_parse_web_info_carousel():
+    node = parse_web_info(load_fixture("web_info_carousel.json"))
+
+    media = media_from_node(node)
+    assert [item["index"] for item in media] == [0, 1, 2]
+    assert [item["type"] for item in media] == ["image", "video", "image"]
+    assert media[0]["url"].startswith(f"{CDN}/v/t51.29350-15/bridge_1_1080.jpg")
+    assert media[1]["url"].startswith(f"{CDN}/o1/v/t16/f2/m86/bridge_2_1080.mp4")
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        load_fixture("web_info_malformed.json"),
+        load_fixture("web_info_not_found.json"),
+        b'{"data": {"xdt_api__v1__media__shortcode__web_info": {"items": []}}}',
+        b'{"data": {"xdt_api__v1__media__shortcode__web_info": {"items": [{"code": "x"}]}}}',
+    ],
+    ids=["malformed", "error-body", "no-items", "no-media-type"],
+)
+def test_parse_web_info_rejects_unexpected_responses(payload):
+    with pytest.raises(ResolveError):
+        parse_web_info(payload)
+
+
+def test_fetch_node_posts_the_shortcode_query():
+    resolver, requests = make_resolver([(200, "web_info_image.json")])
+
+    node = asyncio.run(resolver.fetch_node("DAbCdEfGhIj"))
+
+    assert node["shortcode"] == "DAbCdEfGhIj"
+    request = requests[0]
+    assert request.method == "POST"
+    assert b"DAbCdEfGhIj" in request.content
+    # Anonymous requests only need the CSRF cookie and header to match.
+    assert request.headers["Cookie"] == f"csrftoken={request.headers['X-CSRFToken']}"
+
+
+def test_fetch_node_non_200_raises_without_cooldown():
+    resolver, requests = make_resolver([(404, "web_info_not_found.json"), (200, "web_info_image.json")])
+
+    with pytest.raises(ResolveError):
+        asyncio.run(resolver.fetch_node("DAbCdEfGhIj"))
+    asyncio.run(resolver.fetch_node("DAbCdEfGhIj"))
+
+    assert len(requests) == 2
+
+
+def test_fetch_node_rate_limited_cools_down():
+    resolver, requests = make_resolver([(429, "web_info_rate_limited.json"), (200, "web_info_image.json")])
+
+    with pytest.raises(ResolveError):
+        asyncio.run(resolver.fetch_node("DAbCdEfGhIj"))
+    # During the cooldown the resolver gives up without sending a request.
+    with pytest.raises(ResolveError, match="cooling down"):
+        asyncio.run(resolver.fetch_node("DAbCdEfGhIj"))
+    assert len(requests) == 1
+
+    resolver._cooldown_until = 0
+    assert asyncio.run(resolver.fetch_node("DAbCdEfGhIj"))["shortcode"] == "DAbCdEfGhIj"
+    assert len(requests) == 2
+
+
+@pytest.fixture
+def post_cache(tmp_path, monkeypatch):
+    cache = TieredCache("test-posts", directory=str(tmp_path), max_entries=100, default_ttl=60)
+    monkeypatch.setattr(instagram_routes, "post_cache", cache)
+    monkeypatch.setattr(instagram_routes.settings, "INSTAGRAM_LEAN_RESOLVER", True)
+    return cache
+
+
+def instaloader_entry(url: str) -> dict:
+    media = [{"url": f"{CDN}/v/t51.29350-15/private.jpg?oe=7FFFFFFF", "index": 0, "type": "image"}]
+    return {"metadata": {"media": media}}
+
+
+def test_get_post_media_uses_lean_resolver(post_cache, monkeypatch):
+    async def fetch_node(shortcode):
+        return parse_web_info(load_fixture("web_info_carousel.json"))
+
+    def build_post_entry(url):
+        raise AssertionError("Instaloader should not be used")
+
+    monkeypatch.setattr(instagram_routes.instagram_resolver, "fetch_node", fetch_node)
+    monkeypatch.setattr(instagram_routes, "build_post_entry", build_post_entry)
+
+    media = asyncio.run(instagram_routes.get_post_media("https://www.instagram.com/p/DCdEfGhIjKl/"))
+
+    assert [item["type"] for item in media] == ["image", "video", "image"]
+
+
+@pytest.mark.parametrize(
+    "failure",
+    [ResolveError("status 429"), HTTPException(status_code=500, detail="Failed to extract media URL")],
+    ids=["resolve-error", "unusable-node"],
+)
+def test_get_post_media_falls_back_to_instaloader(post_cache, monkeypatch, failure):
+    calls = []
+
+    async def fetch_node(shortcode):
+        raise failure
+
+    def build_post_entry(url):
+        calls.append(url)
+        return instaloader_entry(url)
+
+    monkeypatch.setattr(instagram_routes.instagram_resolver, "fetch_node", fetch_node)
+    monkeypatch.setattr(instagram_routes, "build_post_entry", build_post_entry)
+    url = "https://www.instagram.com/p/PrIvAtE123/"
+
+    async def resolve_twice():
+        return await instagram_routes.get_post_media(url), await instagram_routes.get_post_media(url)
+
+    first, second = asyncio.run(resolve_twice())
+
+    assert first == second == instaloader_entry(url)["metadata"]["media"]
+    # The post cache serves the second request.
+    assert calls == [url]
+
+
+def test_get_post_media_reports_missing_posts(post_cache, monkeypatch):
+    async def fetch_node(shortcode):
+        raise ResolveError("status 404")
+
+    def build_post_entry(url):
+        return {"error": {"status_code": 404, "detail": "Post not found or private"}}
+
+    monkeypatch.setattr(instagram_routes.instagram_resolver, "fetch_node", fetch_node)
+    monkeypatch.setattr(instagram_routes, "build_post_entry", build_post_entry)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(instagram_routes.get_post_media("https://www.instagram.com/p/GoNe12345/"))
+    assert error.value.status_code == 404